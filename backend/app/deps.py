@@ -1,8 +1,11 @@
+import os
 from typing import Annotated, Callable
 
+import anyio
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
+from app.principal_cache import principal_cache, trust_token_claims
 from app.security import safe_decode_token
 from core.roles import can_access_module, is_admin
 from db.employees import get_employee_by_id
@@ -45,6 +48,44 @@ def _employee_to_current_user(employee: dict) -> CurrentUser:
     )
 
 
+def _claims_to_current_user(payload: dict) -> CurrentUser | None:
+    claims = ("role", "first_name", "display_name", "payroll_role", "hotel_role")
+    if not all(k in payload for k in claims) or not payload["role"]:
+        return None
+    return CurrentUser(
+        user_id=int(payload["sub"]),
+        role=str(payload["role"]),
+        first_name=str(payload["first_name"]),
+        display_name=str(payload["display_name"]),
+        payroll_role=str(payload["payroll_role"]),
+        hotel_role=payload["hotel_role"],
+    )
+
+
+_auth_limiter: anyio.CapacityLimiter | None = None
+
+
+def _auth_db_limiter() -> anyio.CapacityLimiter:
+    """Bounds threads doing auth lookups; created lazily inside the event loop."""
+    global _auth_limiter
+    if _auth_limiter is None:
+        try:
+            tokens = int(os.getenv("AUTH_DB_THREADS", "10"))
+        except ValueError:
+            tokens = 10
+        _auth_limiter = anyio.CapacityLimiter(max(1, tokens))
+    return _auth_limiter
+
+
+def _load_employee(employee_id: int) -> dict | None:
+    employee = principal_cache.get(employee_id)
+    if employee is None:
+        employee = get_employee_by_id(employee_id)
+        if employee:
+            principal_cache.put(employee_id, employee)
+    return employee
+
+
 async def get_current_user(
     credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(security)],
 ) -> CurrentUser:
@@ -59,8 +100,17 @@ async def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token",
         )
+    if trust_token_claims():
+        user = _claims_to_current_user(payload)
+        if user is not None:
+            return user
     employee_id = int(payload["sub"])
-    employee = get_employee_by_id(employee_id)
+    employee = principal_cache.get(employee_id)
+    if employee is None:
+        # Blocking psycopg call: run it off the event loop.
+        employee = await anyio.to_thread.run_sync(
+            _load_employee, employee_id, limiter=_auth_db_limiter()
+        )
     if not employee:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
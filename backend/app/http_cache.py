@@ -0,0 +1,45 @@
+import hashlib
+from datetime import date
+
+from fastapi import Request, Response
+
+from db.data_version import data_version_async
+
+# Browsers may keep the body but must revalidate (If-None-Match) before use.
+CACHE_CONTROL = "private, no-cache"
+
+
+def _matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: ignore W/ prefixes on either side.
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+async def data_etag(request: Request, kind: str, date_from: date, date_to: date) -> str:
+    """Weak ETag for this URL over the current data version of the date range.
+
+    The resolved range is part of the tag: relative ranges ("7d") shift daily.
+    """
+    version = await data_version_async(kind, date_from, date_to)
+    digest = hashlib.sha1(
+        f"{request.url.path}?{request.url.query}|{date_from}|{date_to}|{version}".encode(
+            "utf-8"
+        )
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+
+def apply_etag(request: Request, response: Response, etag: str) -> Response | None:
+    """Return a 304 when the client already has etag; otherwise tag the response."""
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if _matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
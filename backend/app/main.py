@@ -1,6 +1,16 @@
+import asyncio
+import json
 import logging
+import os
+import time
 from contextlib import asynccontextmanager
 
+from db.async_connection import (
+    close_async_pool,
+    close_async_transaction_pool,
+    init_async_pool,
+    init_async_transaction_pool,
+)
 from db.connection import (
     close_pool,
     close_transaction_pool,
@@ -8,6 +18,8 @@ from db.connection import (
     init_transaction_pool,
     load_env_file,
 )
+from db.instrumentation import configure_slow_query_explain, end_request, start_request
+from db.pool_autosize import adaptive_enabled, run_pool_autosizer
 
 # Load .env before importing routers/security so JWT_SECRET and friends are set.
 load_env_file()
@@ -17,6 +29,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.config import cors_origins, is_production, validate_settings
+from app.metrics import observe_request
 from app.routers import (
     admin,
     analytics,
@@ -26,12 +39,14 @@ from app.routers import (
     food_kuku,
     health,
     inventory,
+    metrics,
     snacks_drinks,
     stock_items,
     tills,
 )
 
 logger = logging.getLogger("hotel_api")
+request_logger = logging.getLogger("hotel_api.requests")
 
 validate_settings()
 
@@ -40,12 +55,21 @@ validate_settings()
 async def lifespan(_app: FastAPI):
     init_pool()
     init_transaction_pool()
+    # Read-only GET routes run on the event loop over these async pools.
+    await init_async_pool()
+    await init_async_transaction_pool()
+    autosizer = asyncio.create_task(run_pool_autosizer()) if adaptive_enabled() else None
     yield
+    if autosizer is not None:
+        autosizer.cancel()
+    await close_async_transaction_pool()
+    await close_async_pool()
     close_transaction_pool()
     close_pool()
 
 
 _prod = is_production()
+configure_slow_query_explain(not _prod)
 app = FastAPI(
     title="Hotel Management API",
     version="2.0.0",
@@ -73,6 +97,53 @@ async def unhandled_exception_handler(request: Request, exc: Exception):
     )
 
 
+def _query_warn_count() -> int:
+    try:
+        return int(os.getenv("DB_QUERY_WARN_COUNT", "50"))
+    except ValueError:
+        return 50
+
+
+_QUERY_WARN_COUNT = _query_warn_count()
+
+
+@app.middleware("http")
+async def request_stats(request: Request, call_next):
+    """Route metrics, Server-Timing header and a JSON log line of SQL stats.
+
+    Requests issuing more than DB_QUERY_WARN_COUNT statements log at WARNING
+    so N+1 regressions stand out. Streamed bodies are still running when this
+    fires, so their rows are not included.
+    """
+    stats, token = start_request()
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    except Exception:
+        observe_request(request, 500, time.perf_counter() - start)
+        raise
+    finally:
+        end_request(token)
+    total = time.perf_counter() - start
+    observe_request(request, response.status_code, total)
+    response.headers["Server-Timing"] = stats.server_timing(total)
+    level = logging.WARNING if stats.queries > _QUERY_WARN_COUNT else logging.INFO
+    if request_logger.isEnabledFor(level):
+        request_logger.log(
+            level,
+            json.dumps(
+                {
+                    "method": request.method,
+                    "path": request.url.path,
+                    "status": response.status_code,
+                    "duration_ms": round(total * 1000, 1),
+                    **stats.as_log_fields(),
+                }
+            ),
+        )
+    return response
+
+
 @app.get("/")
 def root():
     return {"service": "Hotel Management API", "health": "/api/health"}
@@ -87,6 +158,9 @@ app.add_middleware(
 )
 
 app.include_router(health.router, prefix="/api")
+app.include_router(metrics.router, prefix="/api")
+# Scrapers expect the conventional unprefixed path.
+app.include_router(metrics.exposition_router)
 app.include_router(auth.router, prefix="/api")
 app.include_router(snacks_drinks.router, prefix="/api")
 app.include_router(food_kuku.router, prefix="/api")
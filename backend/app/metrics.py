@@ -0,0 +1,84 @@
+"""HTTP and pool metrics for the /metrics exposition (see core.metrics)."""
+
+import os
+from typing import Iterable, Optional
+
+from starlette.requests import Request
+
+from core.metrics import REGISTRY, Family
+from db.async_connection import open_async_pools
+from db.connection import describe_pool, open_pools
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total",
+    "HTTP requests by method, route template and status.",
+    ("method", "route", "status"),
+)
+HTTP_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "Time to produce the response (streamed bodies excluded), by route template.",
+    ("method", "route"),
+)
+
+
+def route_label(request: Request) -> str:
+    """Full route template of the matched route, e.g. /api/items/{item_id}.
+
+    Routes of an included router only know their path relative to the
+    include prefix (/api), so the prefix is taken from the leading segments
+    of the request path that the template does not account for.
+    """
+    template = getattr(request.scope.get("route"), "path", None)
+    if not template:
+        return "unmatched"
+    if ":path}" in template:
+        # A path convertor spans several segments; keep the bare template.
+        return template
+    segments = request.scope["path"].rstrip("/").split("/")
+    depth = template.rstrip("/").count("/")
+    prefix = "/".join(segments[: len(segments) - depth])
+    return prefix + template
+
+
+def observe_request(request: Request, status_code: int, seconds: float) -> None:
+    # Route templates keep label cardinality bounded; unknown paths share one.
+    route = route_label(request)
+    HTTP_REQUESTS.inc(request.method, route, str(status_code))
+    HTTP_SECONDS.observe(seconds, request.method, route)
+
+
+# describe_pool key -> (metric name, type, help); *_ms counters exported in seconds.
+_POOL_METRICS = {
+    "pool_size": ("db_pool_connections", "gauge", "Connections open or being opened."),
+    "pool_available": ("db_pool_connections_idle", "gauge", "Idle connections in the pool."),
+    "in_use": ("db_pool_connections_in_use", "gauge", "Connections checked out."),
+    "pool_max": ("db_pool_max_size", "gauge", "Current max_size."),
+    "requests_waiting": ("db_pool_requests_waiting", "gauge", "Checkouts waiting right now."),
+    "requests_num": ("db_pool_requests_total", "counter", "Connection checkouts."),
+    "requests_queued": ("db_pool_requests_queued_total", "counter", "Checkouts that had to wait."),
+    "requests_wait_ms": (
+        "db_pool_requests_wait_seconds_total", "counter", "Time spent waiting for a connection.",
+    ),
+    "requests_errors": ("db_pool_requests_errors_total", "counter", "Checkouts that failed."),
+    "connections_errors": (
+        "db_pool_connection_errors_total", "counter", "Failed connection attempts.",
+    ),
+    "connections_lost": ("db_pool_connections_lost_total", "counter", "Connections found broken."),
+}
+
+
+def _pool_families() -> Iterable[Family]:
+    described = [(p.name, describe_pool(p)) for p in [*open_pools(), *open_async_pools()]]
+    for key, (name, kind, help_text) in _POOL_METRICS.items():
+        scale = 1000 if key.endswith("_ms") else 1
+        samples = [("", {"pool": pool}, stats[key] / scale) for pool, stats in described]
+        yield name, kind, help_text, samples
+
+
+REGISTRY.add_collector(_pool_families)
+
+
+def metrics_token() -> Optional[str]:
+    """Bearer token required by GET /metrics (METRICS_TOKEN), if configured."""
+    token = os.getenv("METRICS_TOKEN", "").strip()
+    return token or None
@@ -0,0 +1,55 @@
+import os
+import time
+from threading import Lock
+from typing import Any, Optional
+
+from core.metrics import cache_result
+
+
+class PrincipalCache:
+    """In-memory TTL cache of employee rows keyed by employee id."""
+
+    def __init__(self, ttl_seconds: int = 60) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[int, tuple[float, dict[str, Any]]] = {}
+        self._lock = Lock()
+
+    def get(self, employee_id: int) -> Optional[dict[str, Any]]:
+        if self.ttl_seconds <= 0:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(employee_id)
+            if entry is not None and entry[0] <= now:
+                del self._entries[employee_id]
+                entry = None
+        cache_result("principal", entry is not None)
+        return entry[1] if entry is not None else None
+
+    def put(self, employee_id: int, employee: dict[str, Any]) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[employee_id] = (time.monotonic() + self.ttl_seconds, employee)
+
+    def invalidate(self, employee_id: Optional[int] = None) -> None:
+        with self._lock:
+            if employee_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(employee_id, None)
+
+
+def _int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def trust_token_claims() -> bool:
+    """When on, signed JWT role claims are used as-is and the DB is not consulted."""
+    return os.getenv("AUTH_TRUST_TOKEN_CLAIMS", "").strip().lower() in ("1", "true", "yes")
+
+
+principal_cache = PrincipalCache(ttl_seconds=_int_env("PRINCIPAL_CACHE_TTL_SEC", 60))
@@ -3,6 +3,13 @@ import time
 from collections import defaultdict
 from threading import Lock
 
+from core.metrics import REGISTRY
+
+LOGIN_BLOCKS = REGISTRY.counter(
+    "login_rate_limit_blocks_total",
+    "Login attempts rejected by the rate limiter.",
+)
+
 
 class LoginRateLimiter:
     """In-memory login attempt limiter keyed by IP + first name."""
@@ -23,7 +30,10 @@ class LoginRateLimiter:
         now = time.monotonic()
         with self._lock:
             self._prune(key, now)
-            return len(self._failures.get(key, [])) >= self.max_attempts
+            blocked = len(self._failures.get(key, [])) >= self.max_attempts
+        if blocked:
+            LOGIN_BLOCKS.inc()
+        return blocked
 
     def record_failure(self, key: str) -> None:
         now = time.monotonic()
@@ -0,0 +1,164 @@
+import csv
+import io
+import itertools
+from decimal import Decimal
+from typing import Any, Iterable, Iterator, Optional, Sequence, TypeVar
+
+import orjson
+from fastapi import HTTPException, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from db.connection import StreamBusyError
+
+T = TypeVar("T")
+
+
+def _default(obj: Any) -> Any:
+    # Same mapping as FastAPI's jsonable_encoder: integral Decimals -> int.
+    if isinstance(obj, Decimal):
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson-rendered JSON; dates/datetimes natively, Decimal via _default."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def json_response(content: Any, response: Response | None = None) -> FastJSONResponse:
+    """Serialize db rows directly, skipping FastAPI's jsonable_encoder pass.
+
+    Routes that set headers on an injected `response` pass it so those
+    headers (ETag, Cache-Control) are carried over.
+    """
+    out = FastJSONResponse(content)
+    if response is not None:
+        for key, value in response.headers.items():
+            if key not in ("content-length", "content-type"):
+                out.headers[key] = value
+    return out
+
+
+def _ndjson_lines(rows: Iterable[dict[str, Any]]) -> Iterator[bytes]:
+    for row in rows:
+        yield orjson.dumps(row, default=_default, option=orjson.OPT_APPEND_NEWLINE)
+
+
+def _csv_chunks(
+    rows: Iterable[dict[str, Any]],
+    fieldnames: Optional[Sequence[str]] = None,
+    chunk_rows: int = 500,
+) -> Iterator[str]:
+    # An explicit header is written up front, so an empty range is still a
+    # valid CSV; otherwise it comes from the first row.
+    buf = io.StringIO()
+    writer = None
+    if fieldnames is not None:
+        writer = csv.DictWriter(buf, fieldnames=list(fieldnames), extrasaction="ignore")
+        writer.writeheader()
+    pending = 0
+    for row in rows:
+        if writer is None:
+            writer = csv.DictWriter(buf, fieldnames=list(row.keys()), extrasaction="ignore")
+            writer.writeheader()
+        writer.writerow(row)
+        pending += 1
+        if pending >= chunk_rows:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+            pending = 0
+    if buf.tell():
+        yield buf.getvalue()
+
+
+class _ChunkSink:
+    """Write-only file for pyarrow that hands out what was written so far.
+
+    tell() keeps counting across drains: Parquet footers record absolute offsets.
+    """
+
+    closed = False
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._pos = 0
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        out = b"".join(self._chunks)
+        self._chunks.clear()
+        return out
+
+
+def _parquet_chunks(batches: Iterable[list[dict[str, Any]]], schema: Any) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        # One row group per batch; each is flushed to the client once written.
+        for batch in batches:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def started(items: Iterator[T]) -> Iterator[T]:
+    """Pull the first item now so opening the DB stream fails before the 200.
+
+    Busy streaming connections (db.connection.get_stream_conn) become a 503.
+    """
+    try:
+        first = next(items, None)
+    except StreamBusyError:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many exports in progress, try again shortly",
+            headers={"Retry-After": "10"},
+        )
+    return itertools.chain(() if first is None else (first,), items)
+
+
+def ndjson_stream(rows: Iterable[dict[str, Any]]) -> StreamingResponse:
+    """One JSON object per line, encoded as rows arrive."""
+    return StreamingResponse(_ndjson_lines(rows), media_type="application/x-ndjson")
+
+
+def csv_stream(
+    rows: Iterable[dict[str, Any]],
+    filename: str,
+    fieldnames: Optional[Sequence[str]] = None,
+) -> StreamingResponse:
+    """CSV download with a fixed header, written in chunks as rows arrive."""
+    return StreamingResponse(
+        _csv_chunks(rows, fieldnames),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def parquet_stream(
+    batches: Iterable[list[dict[str, Any]]], schema: Any, filename: str
+) -> StreamingResponse:
+    """Parquet download written one row group per batch (needs pyarrow)."""
+    return StreamingResponse(
+        _parquet_chunks(batches, schema),
+        media_type="application/vnd.apache.parquet",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
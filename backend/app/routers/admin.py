@@ -1,8 +1,11 @@
-from typing import Annotated
+from datetime import date
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 from app.deps import CurrentUser, require_admin
+from app.principal_cache import principal_cache
+from app.responses import csv_stream, parquet_stream, started
 from app.schemas.admin import (
     HotelRoleUpdatePayload,
     PriceUpdatePayload,
@@ -12,6 +15,7 @@ from app.schemas.admin import (
 )
 from core.roles import ALL_ROLES, ROLE_ADMIN
 from db import admin_audit as admin_audit_db
+from db import exports as exports_db
 from db import items as items_db
 from db.employees import get_employee_by_id, list_employees_with_hotel_roles, update_employee_hotel_role
 
@@ -134,6 +138,7 @@ def set_employee_hotel_role(
         raise HTTPException(status_code=404, detail="Employee not found")
 
     employee = update_employee_hotel_role(employee_id, hotel_role)
+    principal_cache.invalidate(employee_id)
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
 
@@ -158,3 +163,27 @@ def list_admin_action_log(
     capped = min(max(limit, 1), 500)
     actions = admin_audit_db.list_admin_actions(capped)
     return {"actions": actions}
+
+
+@router.get("/admin/exports/daily")
+def export_daily_ledger(
+    _admin: Annotated[CurrentUser, Depends(require_admin)],
+    group: str = Query(...),
+    date_from: date = Query(...),
+    date_to: date = Query(...),
+    format: Literal["csv", "parquet"] = "csv",
+):
+    if group not in exports_db.LEDGER_COLUMNS:
+        raise HTTPException(status_code=400, detail="Invalid group")
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must be on or before date_to")
+    filename = f"{group}-daily-{date_from}-{date_to}.{format}"
+    if format == "csv":
+        rows = started(exports_db.iter_daily_rows(group, date_from, date_to))
+        return csv_stream(rows, filename, exports_db.export_columns(group))
+    try:
+        schema = exports_db.ledger_parquet_schema(group)
+    except ImportError:
+        raise HTTPException(status_code=400, detail="Parquet export requires pyarrow on the server")
+    batches = started(exports_db.iter_daily_batches(group, date_from, date_to))
+    return parquet_stream(batches, schema, filename)
@@ -1,12 +1,14 @@
 from datetime import date, timedelta
 from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 
 from app.deps import CurrentUser, require_admin
+from app.http_cache import apply_etag, data_etag
+from app.responses import FastJSONResponse, json_response
 from db import analytics as analytics_db
 
-router = APIRouter(tags=["analytics"])
+router = APIRouter(tags=["analytics"], default_response_class=FastJSONResponse)
 
 RangeKey = Literal["yesterday", "7d", "30d", "90d"]
 CategoryKey = Literal["snacks", "drinks", "food", "kuku"]
@@ -27,7 +29,9 @@ def _range_to_dates(range_key: str) -> tuple[date, date]:
 
 
 @router.get("/analytics/sales-totals")
-def get_sales_totals(
+async def get_sales_totals(
+    request: Request,
+    response: Response,
     _admin: Annotated[CurrentUser, Depends(require_admin)],
     range: RangeKey | None = Query(None, alias="range"),
     entry_date: date | None = Query(None, alias="date"),
@@ -45,18 +49,22 @@ def get_sales_totals(
                 detail="Invalid range. Use yesterday, 7d, 30d, or 90d.",
             )
         range_out = range_key
-    result = analytics_db.sales_totals(date_from, date_to)
-    return {"range": range_out, **result}
+    etag = await data_etag(request, "sales", date_from, date_to)
+    not_modified = apply_etag(request, response, etag)
+    if not_modified is not None:
+        return not_modified
+    result = await analytics_db.sales_totals_async(date_from, date_to)
+    return json_response({"range": range_out, **result}, response)
 
 
 @router.get("/analytics/items-sold")
-def get_items_sold(
+async def get_items_sold(
     _admin: Annotated[CurrentUser, Depends(require_admin)],
     category: CategoryKey = Query(...),
     entry_date: date = Query(..., alias="date"),
 ):
     try:
-        return analytics_db.items_sold(category, entry_date)
+        return json_response(await analytics_db.items_sold_async(category, entry_date))
     except ValueError:
         raise HTTPException(
             status_code=400,
@@ -1,17 +1,21 @@
 from datetime import date
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 
 from app.deps import CurrentUser, require_admin
+from app.http_cache import apply_etag, data_etag
+from app.responses import FastJSONResponse, json_response
 from db import audit_sales as audit_sales_db
 
 
-router = APIRouter(tags=["audit"])
+router = APIRouter(tags=["audit"], default_response_class=FastJSONResponse)
 
 
 @router.get("/audit/sales-report")
-def sales_report(
+async def sales_report(
+    request: Request,
+    response: Response,
     _admin: Annotated[CurrentUser, Depends(require_admin)],
     date_from: date = Query(...),
     date_to: date = Query(...),
@@ -21,4 +25,10 @@ def sales_report(
             status_code=400,
             detail="date_from must be on or before date_to",
         )
-    return audit_sales_db.sales_report(date_from, date_to)
+    etag = await data_etag(request, "sales", date_from, date_to)
+    not_modified = apply_etag(request, response, etag)
+    if not_modified is not None:
+        return not_modified
+    return json_response(
+        await audit_sales_db.sales_report_async(date_from, date_to), response
+    )
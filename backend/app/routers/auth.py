@@ -56,6 +56,8 @@ def login(payload: LoginPayload, request: Request):
         hotel_role=effective,
         display_name=employee["display_name"],
         payroll_role=employee["payroll_role"],
+        first_name=employee["first_name"],
+        assigned_hotel_role=employee.get("hotel_role"),
     )
     return {
         "access_token": token,
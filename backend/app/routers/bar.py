@@ -1,9 +1,10 @@
 from datetime import date
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 
 from app.deps import CurrentUser, require_module
+from app.http_cache import apply_etag, data_etag
 from app.schemas.daily import DailyBarPayload
 from core.roles import MODULE_BAR
 from db import daily as daily_db
@@ -12,11 +13,17 @@ router = APIRouter(tags=["bar"])
 
 
 @router.get("/bar")
-def get_bar(
+async def get_bar(
+    request: Request,
+    response: Response,
     user: Annotated[CurrentUser, Depends(require_module(MODULE_BAR))],
     entry_date: date = Query(..., alias="date"),
 ):
-    rows = daily_db.get_bar_daily(entry_date)
+    etag = await data_etag(request, "bar", entry_date, entry_date)
+    not_modified = apply_etag(request, response, etag)
+    if not_modified is not None:
+        return not_modified
+    rows = await daily_db.get_bar_daily_async(entry_date)
     total_sold_units = sum(
         float(r["sold_units"]) for r in rows if r.get("sold_units") is not None
     )
@@ -1,32 +1,49 @@
 from datetime import date
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 
 from app.deps import CurrentUser, require_module
+from app.http_cache import apply_etag, data_etag
 from app.schemas.admin import FoodDishPayload
 from app.schemas.daily import DailyQuantityPayload
 from core.roles import MODULE_FOOD_KUKU, ROLE_FOOD_CLERK
 from db import admin_audit as admin_audit_db
 from db import daily as daily_db
 from db import items as items_db
+from db.day_cache import day_cache
 
 router = APIRouter(tags=["food-kuku"])
 
 
 @router.get("/food-kuku")
-def get_food_kuku(
+async def get_food_kuku(
+    request: Request,
+    response: Response,
     user: Annotated[CurrentUser, Depends(require_module(MODULE_FOOD_KUKU))],
     entry_date: date = Query(..., alias="date"),
 ):
-    rows = daily_db.get_food_kuku_daily(entry_date)
+    cache_key = ("food-kuku", entry_date)
+    version = day_cache.version(entry_date, (MODULE_FOOD_KUKU,))
+    cached = day_cache.get(cache_key, version)
+    if cached is not None:
+        etag, body = cached
+        return apply_etag(request, response, etag) or body
+    etag = await data_etag(request, "food_kuku", entry_date, entry_date)
+    not_modified = apply_etag(request, response, etag)
+    if not_modified is not None:
+        return not_modified
+    rows = await daily_db.get_food_kuku_daily_async(entry_date)
     total_revenue = sum(float(r["quantity"]) * float(r["price_ksh"]) for r in rows)
-    return {
+    body = {
         "date": str(entry_date),
         "entries": rows,
         "total_revenue": total_revenue,
-        "locked": daily_db.is_food_kuku_day_locked(entry_date),
+        "locked": await daily_db.is_food_kuku_day_locked_async(entry_date),
     }
+    if body["locked"]:
+        day_cache.put(cache_key, version, (etag, body))
+    return body
 
 
 @router.post("/food-kuku/dishes")
@@ -1,9 +1,17 @@
-from datetime import date
-from typing import Annotated, Optional
+import base64
+from datetime import date, datetime
+from typing import Annotated, Literal, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 
 from app.deps import CurrentUser, get_current_user
+from app.responses import (
+    FastJSONResponse,
+    csv_stream,
+    json_response,
+    ndjson_stream,
+    started,
+)
 from core.roles import (
     MODULE_BAR,
     MODULE_FOOD_KUKU,
@@ -13,7 +21,7 @@ from core.roles import (
 )
 from db import daily as daily_db
 
-router = APIRouter(tags=["inventory"])
+router = APIRouter(tags=["inventory"], default_response_class=FastJSONResponse)
 
 GROUP_MODULE_MAP = {
     "snacks_drinks": MODULE_SNACKS_DRINKS,
@@ -31,16 +39,44 @@ def _check_group_access(user: CurrentUser, group: str) -> None:
         raise HTTPException(status_code=403, detail="Access denied")
 
 
+def _encode_cursor(key: tuple[datetime, int]) -> str:
+    changed_at, entry_id = key
+    raw = f"{changed_at.isoformat()}|{entry_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        changed_at, _, entry_id = raw.partition("|")
+        return datetime.fromisoformat(changed_at), int(entry_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.get("/inventory/audit")
 def inventory_audit(
     user: Annotated[CurrentUser, Depends(get_current_user)],
     group: str = Query(...),
     date_from: date = Query(...),
     date_to: date = Query(...),
+    format: Literal["json", "ndjson", "csv"] = "json",
 ):
     _check_group_access(user, group)
+    if format != "json":
+        # Streamed exports page through a server-side cursor.
+        rows = started(daily_db.iter_inventory_audit(group, date_from, date_to))
+        if format == "ndjson":
+            return ndjson_stream(rows)
+        return csv_stream(
+            rows,
+            f"inventory-audit-{group}-{date_from}-{date_to}.csv",
+            daily_db.AUDIT_COLUMNS[group],
+        )
     rows = daily_db.get_inventory_audit(group, date_from, date_to)
-    return {"group": group, "date_from": str(date_from), "date_to": str(date_to), "rows": rows}
+    return json_response(
+        {"group": group, "date_from": str(date_from), "date_to": str(date_to), "rows": rows}
+    )
 
 
 @router.get("/inventory/changelog")
@@ -49,7 +85,18 @@ def inventory_changelog(
     group: str = Query(...),
     date_from: Optional[date] = None,
     date_to: Optional[date] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=500),
 ):
     _check_group_access(user, group)
-    rows = daily_db.get_audit_timeline(group, date_from, date_to)
-    return {"group": group, "entries": rows}
+    before = _decode_cursor(cursor) if cursor else None
+    rows, next_key = daily_db.get_audit_timeline(
+        group, date_from, date_to, before=before, limit=limit
+    )
+    return json_response(
+        {
+            "group": group,
+            "entries": rows,
+            "next_cursor": _encode_cursor(next_key) if next_key else None,
+        }
+    )
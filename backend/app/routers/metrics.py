@@ -0,0 +1,41 @@
+import secrets
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from app.config import is_production
+from app.deps import CurrentUser, require_admin
+from app.metrics import metrics_token
+from core.metrics import REGISTRY
+from db.async_connection import open_async_pools
+from db.connection import describe_pool, open_pools
+from db.pool_autosize import adaptive_enabled
+
+router = APIRouter(tags=["metrics"])
+exposition_router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics/pools")
+def pool_metrics(_admin: Annotated[CurrentUser, Depends(require_admin)]):
+    """Live psycopg_pool stats: queueing, wait time, connections in use, errors."""
+    pools = [*open_pools(), *open_async_pools()]
+    return {
+        "adaptive": adaptive_enabled(),
+        "pools": {pool.name: describe_pool(pool) for pool in pools},
+    }
+
+
+@exposition_router.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics(authorization: Optional[str] = Header(None)):
+    """Prometheus text format. Needs `Bearer $METRICS_TOKEN` when that is set;
+    without a token it is only served outside production."""
+    token = metrics_token()
+    if token is None:
+        if is_production():
+            raise HTTPException(status_code=404, detail="Not Found")
+    elif not secrets.compare_digest(authorization or "", f"Bearer {token}"):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return PlainTextResponse(
+        REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
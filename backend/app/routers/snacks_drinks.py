@@ -1,35 +1,52 @@
 from datetime import date
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 
 from app.deps import CurrentUser, require_module
+from app.http_cache import apply_etag, data_etag
 from app.schemas.daily import DailySnacksPayload
 from core.roles import MODULE_SNACKS_DRINKS, ROLE_SNACKS_CLERK
 from db import daily as daily_db
+from db.day_cache import day_cache
 
 router = APIRouter(tags=["snacks-drinks"])
 
 
 @router.get("/snacks-drinks")
-def get_snacks_drinks(
+async def get_snacks_drinks(
+    request: Request,
+    response: Response,
     user: Annotated[CurrentUser, Depends(require_module(MODULE_SNACKS_DRINKS))],
     entry_date: date = Query(..., alias="date"),
 ):
-    rows = daily_db.get_snacks_drinks_daily(entry_date)
+    cache_key = ("snacks-drinks", entry_date)
+    version = day_cache.version(entry_date, (MODULE_SNACKS_DRINKS,))
+    cached = day_cache.get(cache_key, version)
+    if cached is not None:
+        etag, body = cached
+        return apply_etag(request, response, etag) or body
+    etag = await data_etag(request, "snacks_drinks", entry_date, entry_date)
+    not_modified = apply_etag(request, response, etag)
+    if not_modified is not None:
+        return not_modified
+    rows = await daily_db.get_snacks_drinks_daily_async(entry_date)
     total_sold_units = sum(
         float(r["sold_units"]) for r in rows if r.get("sold_units") is not None
     )
     total_revenue = sum(
         float(r["revenue"]) for r in rows if r.get("revenue") is not None
     )
-    return {
+    body = {
         "date": str(entry_date),
         "entries": rows,
         "total_sold_units": total_sold_units,
         "total_revenue": total_revenue,
-        "locked": daily_db.is_snacks_drinks_day_locked(entry_date),
+        "locked": await daily_db.is_snacks_drinks_day_locked_async(entry_date, rows),
     }
+    if body["locked"]:
+        day_cache.put(cache_key, version, (etag, body))
+    return body
 
 
 @router.post("/snacks-drinks")
@@ -4,13 +4,14 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException, Query
 
 from app.deps import CurrentUser, require_admin
+from app.responses import FastJSONResponse, json_response
 from db import tills as tills_db
 
-router = APIRouter(tags=["tills"])
+router = APIRouter(tags=["tills"], default_response_class=FastJSONResponse)
 
 
 @router.get("/tills/report")
-def get_tills_report(
+async def get_tills_report(
     _admin: Annotated[CurrentUser, Depends(require_admin)],
     date_from: date = Query(...),
     date_to: date = Query(...),
@@ -21,6 +22,6 @@ def get_tills_report(
             detail="date_from must be on or before date_to.",
         )
     try:
-        return tills_db.tills_report(date_from, date_to)
+        return json_response(await tills_db.tills_report_async(date_from, date_to))
     except tills_db.TillsConfigError as exc:
         raise HTTPException(status_code=503, detail=str(exc)) from exc
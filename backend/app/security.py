@@ -35,6 +35,8 @@ def create_access_token(
     hotel_role: str,
     display_name: str,
     payroll_role: str,
+    first_name: str | None = None,
+    assigned_hotel_role: str | None = None,
 ) -> str:
     expire = datetime.now(timezone.utc) + timedelta(hours=_jwt_expire_hours())
     payload = {
@@ -44,6 +46,10 @@ def create_access_token(
         "display_name": display_name,
         "exp": expire,
     }
+    if first_name is not None:
+        # Full principal claims let deps skip the employee lookup when trusted.
+        payload["first_name"] = first_name
+        payload["hotel_role"] = assigned_hotel_role
     return jwt.encode(payload, _jwt_secret(), algorithm=JWT_ALGORITHM)
 
 
@@ -0,0 +1,9 @@
+"""Reproducible db.* benchmarks over a synthetic multi-year hotel dataset.
+
+Run against a disposable local Postgres (never Neon):
+
+    BENCH_DATABASE_URL=postgresql://localhost/hotel_bench \
+        python -m benchmarks.run --years 3 --output benchmarks/baseline.json
+
+See benchmarks/run.py for options (--compare to check against a baseline).
+"""
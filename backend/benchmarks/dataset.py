@@ -0,0 +1,290 @@
+"""Synthetic hotel dataset: catalog from core.catalog, years of daily rows.
+
+Everything is drawn from a seeded random.Random (and setseed() on the SQL
+side), so the same --years/--seed always produces the same data.
+"""
+
+import random
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+
+from core.catalog import (
+    BAR_ITEMS,
+    FOOD_KUKU_CATEGORIES,
+    ITEM_PRICES,
+    SNACKS_DRINKS_CATEGORIES,
+    STOCK_STARTER_ITEMS,
+)
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+
+BENCH_PHONE_NUMBER = "0700000001"
+# Every synthetic employee logs in with their first name and this PIN.
+BENCH_PIN = 1234
+# Default last day of generated history (benchmarks and load tests agree on it).
+DEFAULT_END = date(2025, 12, 31)
+
+# Payroll tables live outside this repo's migrations (see docs/NEON_SCHEMA.md);
+# a fresh bench database gets the columns the hotel app reads.
+_PAYROLL_SQL = """
+    CREATE TABLE IF NOT EXISTS employee (
+      id         SERIAL PRIMARY KEY,
+      first_name VARCHAR NOT NULL,
+      last_name  VARCHAR NOT NULL DEFAULT '',
+      role       TEXT NOT NULL DEFAULT 'STAFF'
+    );
+    CREATE TABLE IF NOT EXISTS user_auth (
+      id         INT PRIMARY KEY REFERENCES employee(id),
+      pin        INT NOT NULL,
+      first_name VARCHAR NOT NULL,
+      created_at TIMESTAMP NOT NULL DEFAULT NOW()
+    );
+    CREATE TABLE IF NOT EXISTS transactions (
+      id           SERIAL PRIMARY KEY,
+      phone_number TEXT NOT NULL,
+      value_date   TIMESTAMP NOT NULL,
+      credit       NUMERIC(12, 2)
+    );
+    CREATE INDEX IF NOT EXISTS idx_transactions_phone_date
+      ON transactions (phone_number, value_date);
+"""
+
+# (first_name, payroll role, hotel_role); ids are 1.. in this order.
+EMPLOYEES = [
+    ("Bench", "ADMIN", None),
+    ("Snacks", "STAFF", "snacks_clerk"),
+    ("Food", "STAFF", "food_clerk"),
+    ("Stock", "STAFF", "stock_clerk"),
+    ("Bar", "STAFF", "bar_clerk"),
+]
+CLERK_BY_TABLE = {
+    "snacks_drinks_daily": 2,
+    "food_kuku_daily": 3,
+    "stock_items_daily": 4,
+    "bar_daily": 5,
+}
+VALUE_COLUMNS = {
+    "snacks_drinks_daily": ("closing_stock", "added_stock"),
+    "food_kuku_daily": ("quantity",),
+    "stock_items_daily": ("closing_stock", "added_stock"),
+    "bar_daily": ("added_stock", "closing_stock"),
+}
+# Days at the end of the range left unlocked, like a live ledger.
+OPEN_DAYS = 7
+
+
+def apply_migrations(conn) -> None:
+    """Payroll stand-ins, then every migrations/*.sql (all idempotent)."""
+    conn.execute(_PAYROLL_SQL)
+    conn.commit()
+    for path in sorted((BACKEND_ROOT / "migrations").glob("*.sql")):
+        conn.execute(path.read_text(encoding="utf-8"))
+        conn.commit()
+
+
+def _catalog() -> list[dict[str, Any]]:
+    items: list[dict[str, Any]] = []
+    for category, priced in ITEM_PRICES.items():
+        if category in SNACKS_DRINKS_CATEGORIES:
+            group, subcategory = "snacks_drinks", category.lower()
+        elif category in FOOD_KUKU_CATEGORIES:
+            group, subcategory = "food_kuku", None
+        else:
+            continue
+        for name, price in priced.items():
+            items.append(
+                {"name": name, "group": group, "subcategory": subcategory,
+                 "order": 0, "price": float(price)}
+            )
+    for name in STOCK_STARTER_ITEMS:
+        items.append(
+            {"name": name, "group": "stock", "subcategory": None, "order": 0, "price": 0.0}
+        )
+    for order, (name, price) in enumerate(BAR_ITEMS, start=1):
+        items.append(
+            {"name": name, "group": "bar", "subcategory": None, "order": order,
+             "price": float(price)}
+        )
+    return items
+
+
+def _stock_walk(rng: random.Random, days: list[date], *, skip_rate: float = 0.0):
+    """(day, closing, added) for a stock-style ledger; closing never exceeds total."""
+    closing = float(rng.randint(10, 40))
+    for day in days:
+        if skip_rate and rng.random() < skip_rate:
+            continue
+        added = float(rng.choice((0, 0, 0, rng.randint(10, 60))))
+        sold = float(rng.randint(0, int(min(closing + added, 30))))
+        closing = closing + added - sold
+        yield day, closing, added
+
+
+def _copy(conn, table: str, columns: tuple[str, ...], rows) -> int:
+    count = 0
+    with conn.cursor().copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN") as copy:
+        for row in rows:
+            copy.write_row(row)
+            count += 1
+    return count
+
+
+def generate(conn, years: int, seed: int, end: date) -> dict[str, Any]:
+    """Replace all hotel data with `years` of synthetic history ending at `end`.
+
+    Destructive: truncates every hotel table. Returns row counts per table.
+    """
+    rng = random.Random(seed)
+    start = end - timedelta(days=365 * years - 1)
+    days = [start + timedelta(days=n) for n in range((end - start).days + 1)]
+
+    conn.execute(
+        """
+        TRUNCATE items, item_prices, item_price_intervals, snacks_drinks_daily,
+                 food_kuku_daily, stock_items_daily, bar_daily, inventory_audit_log,
+                 food_kuku_day_lock, snacks_drinks_day_lock, daily_item_sales,
+                 transactions, user_auth, employee
+        RESTART IDENTITY CASCADE
+        """
+    )
+    _copy(
+        conn,
+        "employee",
+        ("first_name", "last_name", "role"),
+        ((name, "Bench", role) for name, role, _ in EMPLOYEES),
+    )
+    _copy(
+        conn,
+        "user_auth",
+        ("id", "pin", "first_name"),
+        ((n, BENCH_PIN, name) for n, (name, _, _) in enumerate(EMPLOYEES, start=1)),
+    )
+    for employee_id, (_, _, hotel_role) in enumerate(EMPLOYEES, start=1):
+        if hotel_role:
+            conn.execute(
+                "UPDATE employee SET hotel_role = %s::hotel_role WHERE id = %s",
+                (hotel_role, employee_id),
+            )
+
+    catalog = _catalog()
+    _copy(
+        conn,
+        "items",
+        ("name", "group_type", "subcategory", "display_order"),
+        ((i["name"], i["group"], i["subcategory"], i["order"]) for i in catalog),
+    )
+    ids = {
+        (r["group_type"], r["name"]): r["id"]
+        for r in conn.execute("SELECT id, group_type::text, name FROM items").fetchall()
+    }
+    for item in catalog:
+        item["id"] = ids[(item["group"], item["name"])]
+
+    # Opening price at the start, then roughly one change a year per item.
+    price_rows = []
+    for item in catalog:
+        price = item["price"]
+        price_rows.append((item["id"], price, start, 1))
+        for _ in range(years):
+            price = max(10.0, round(price * rng.uniform(0.95, 1.2) / 10) * 10)
+            price_rows.append((item["id"], price, rng.choice(days[1:]), 1))
+    counts = {
+        "item_prices": _copy(
+            conn, "item_prices",
+            ("item_id", "price_ksh", "effective_from", "updated_by"), price_rows,
+        )
+    }
+
+    def by_group(group: str) -> list[dict[str, Any]]:
+        return [i for i in catalog if i["group"] == group]
+
+    def ledger_rows(group: str, skip_rate: float = 0.0):
+        clerk = CLERK_BY_TABLE[
+            {"snacks_drinks": "snacks_drinks_daily", "stock": "stock_items_daily",
+             "bar": "bar_daily"}[group]
+        ]
+        for item in by_group(group):
+            for day, closing, added in _stock_walk(rng, days, skip_rate=skip_rate):
+                yield day, item["id"], closing, added, clerk
+
+    counts["snacks_drinks_daily"] = _copy(
+        conn, "snacks_drinks_daily",
+        ("entry_date", "item_id", "closing_stock", "added_stock", "submitted_by"),
+        ledger_rows("snacks_drinks"),
+    )
+    counts["stock_items_daily"] = _copy(
+        conn, "stock_items_daily",
+        ("entry_date", "item_id", "closing_stock", "added_stock", "submitted_by"),
+        ledger_rows("stock"),
+    )
+    # Bar clerks skip days; the audit carries the last closing forward.
+    counts["bar_daily"] = _copy(
+        conn, "bar_daily",
+        ("entry_date", "item_id", "closing_stock", "added_stock", "submitted_by"),
+        ledger_rows("bar", skip_rate=0.1),
+    )
+    counts["food_kuku_daily"] = _copy(
+        conn, "food_kuku_daily",
+        ("entry_date", "item_id", "quantity", "submitted_by"),
+        (
+            (day, item["id"], float(qty), CLERK_BY_TABLE["food_kuku_daily"])
+            for item in by_group("food_kuku")
+            for day in days
+            for qty in (rng.choice((0, 0, rng.randint(1, 12))),)
+            if qty > 0
+        ),
+    )
+
+    locked_days = days[:-OPEN_DAYS]
+    for table in ("food_kuku_day_lock", "snacks_drinks_day_lock"):
+        _copy(conn, table, ("entry_date", "locked_by"), ((d, 1) for d in locked_days))
+
+    counts["transactions"] = _copy(
+        conn, "transactions",
+        ("phone_number", "value_date", "credit"),
+        (
+            (BENCH_PHONE_NUMBER, f"{day} {rng.randint(7, 21):02d}:{rng.randint(0, 59):02d}",
+             float(rng.randint(50, 2000)))
+            for day in days
+            for _ in range(rng.randint(5, 40))
+        ),
+    )
+
+    # Audit history: every column on insert, plus ~5% later corrections.
+    conn.execute("SELECT setseed(%s)", (((seed % 1000) / 1000.0),))
+    for table, columns in VALUE_COLUMNS.items():
+        values = ", ".join(f"('{c}', d.{c})" for c in columns)
+        conn.execute(
+            f"""
+            INSERT INTO inventory_audit_log
+              (table_name, record_id, item_id, entry_date, field_name,
+               old_value, new_value, changed_by, changed_at)
+            SELECT '{table}', d.id, d.item_id, d.entry_date, v.field,
+                   NULL, v.value::text, d.submitted_by,
+                   d.entry_date + TIME '20:00' + random() * INTERVAL '3 hours'
+            FROM {table} d
+            CROSS JOIN LATERAL (VALUES {values}) AS v(field, value)
+            UNION ALL
+            SELECT '{table}', d.id, d.item_id, d.entry_date, '{columns[0]}',
+                   (d.{columns[0]} + 1)::text, d.{columns[0]}::text, 1,
+                   d.entry_date + INTERVAL '1 day' + random() * INTERVAL '8 hours'
+            FROM {table} d
+            WHERE random() < 0.05
+            """
+        )
+    counts["inventory_audit_log"] = conn.execute(
+        "SELECT COUNT(*) AS n FROM inventory_audit_log"
+    ).fetchone()["n"]
+    conn.commit()
+
+    # Price intervals and the sales rollup are full rebuilds in their
+    # migrations; re-running them derives both from the generated rows.
+    apply_migrations(conn)
+    counts["daily_item_sales"] = conn.execute(
+        "SELECT COUNT(*) AS n FROM daily_item_sales"
+    ).fetchone()["n"]
+    conn.execute("ANALYZE")
+    conn.commit()
+    counts["items"] = len(catalog)
+    return {"start": str(start), "end": str(end), "rows": counts}
@@ -0,0 +1,255 @@
+"""Time hot db.* functions against a synthetic dataset; write a JSON baseline.
+
+    python -m benchmarks.run [--years 3] [--seed 42] [--repeat 7]
+                             [--skip-generate] [--output FILE] [--compare FILE]
+
+BENCH_DATABASE_URL must point at a throwaway database: generation truncates
+every hotel table. Non-local hosts are refused unless --allow-remote is given.
+Each case gets one untimed call first. Read paths are the *_async functions
+the routers serve, run on one event loop with the async pools; day_cache-backed
+reports are timed twice, "[cold]" (cache cleared before every call) and
+"[warm]" (served from the cache where days are finalized).
+"""
+
+import argparse
+import asyncio
+import contextvars
+import inspect
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable
+from urllib.parse import urlparse
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_ROOT))
+
+_LOCAL_HOSTS = {"", "localhost", "127.0.0.1", "::1"}
+
+
+def _configure_env(allow_remote: bool) -> None:
+    url = os.getenv("BENCH_DATABASE_URL", "").strip()
+    if not url:
+        sys.exit("BENCH_DATABASE_URL is not set (use a throwaway local database).")
+    host = urlparse(url).hostname or ""
+    if host not in _LOCAL_HOSTS and not allow_remote:
+        sys.exit(f"Refusing non-local BENCH_DATABASE_URL host {host!r}; pass --allow-remote.")
+    # Set before db.* is imported so backend/.env cannot point us at Neon.
+    from benchmarks.dataset import BENCH_PHONE_NUMBER
+
+    os.environ["DATABASE_URL"] = url
+    os.environ["TRANSACTION_DATABASE_URL"] = url
+    os.environ["PHONE_NUMBER"] = BENCH_PHONE_NUMBER
+
+
+Case = tuple[Callable[[int], Any], bool]
+
+
+def _time_case(
+    run: Callable[[Any], Any], fn: Callable[[int], Any], cold: bool, repeat: int
+) -> dict[str, Any]:
+    from db.day_cache import day_cache
+    from db.instrumentation import end_request, start_request
+
+    run(fn(-1))
+    samples: list[float] = []
+    queries = 0
+    for n in range(repeat):
+        if cold:
+            day_cache.bump_all()
+        stats, token = start_request()
+        start = time.perf_counter()
+        try:
+            run(fn(n))
+        finally:
+            samples.append((time.perf_counter() - start) * 1000)
+            end_request(token)
+        queries = stats.queries
+    samples.sort()
+    return {
+        "min_ms": round(samples[0], 2),
+        "median_ms": round(statistics.median(samples), 2),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 2),
+        "max_ms": round(samples[-1], 2),
+        "queries": queries,
+    }
+
+
+def _cases(end: date) -> dict[str, Case]:
+    """name -> (fn(n), cold); fn returns a coroutine for async cases."""
+    from db import analytics, audit_sales, daily, items, tills
+
+    locked_day = end - timedelta(days=30)
+    # Saves rewrite the last (unlocked) day, alternating values so every
+    # iteration really updates rows and writes audit entries.
+    open_day = end
+    month = (end - timedelta(days=29), end)
+    year = (end - timedelta(days=364), end)
+
+    def ids(group: str) -> list[int]:
+        return [int(r["id"]) for r in items.list_items_by_group(group)]
+
+    snacks, food, stock, bar = ids("snacks_drinks"), ids("food_kuku"), ids("stock"), ids("bar")
+
+    def stock_entries(item_ids: list[int], n: int) -> list[dict[str, Any]]:
+        return [
+            {"item_id": i, "added_stock": 100, "closing_stock": 50 + n % 2}
+            for i in item_ids
+        ]
+
+    cases: dict[str, Case] = {
+        "get_snacks_drinks_daily_async": (
+            lambda n: daily.get_snacks_drinks_daily_async(locked_day), False
+        ),
+        "get_food_kuku_daily_async": (
+            lambda n: daily.get_food_kuku_daily_async(locked_day), False
+        ),
+        "get_stock_items_daily": (lambda n: daily.get_stock_items_daily(locked_day), False),
+        "get_bar_daily_async": (lambda n: daily.get_bar_daily_async(locked_day), False),
+        "save_snacks_drinks_daily": (
+            lambda n: daily.save_snacks_drinks_daily(open_day, stock_entries(snacks, n), 2),
+            False,
+        ),
+        "save_food_kuku_daily": (
+            lambda n: daily.save_food_kuku_daily(
+                open_day, [{"item_id": i, "quantity": 3 + n % 2} for i in food], 3
+            ),
+            False,
+        ),
+        "save_stock_items_daily": (
+            lambda n: daily.save_stock_items_daily(open_day, stock_entries(stock, n), 4),
+            False,
+        ),
+        "save_bar_daily": (
+            lambda n: daily.save_bar_daily(open_day, stock_entries(bar, n), 5), False
+        ),
+        "get_inventory_audit[snacks_drinks,month]": (
+            lambda n: daily.get_inventory_audit("snacks_drinks", *month), False
+        ),
+        "get_inventory_audit[snacks_drinks,year]": (
+            lambda n: daily.get_inventory_audit("snacks_drinks", *year), False
+        ),
+        "get_inventory_audit[food_kuku,year]": (
+            lambda n: daily.get_inventory_audit("food_kuku", *year), False
+        ),
+        "get_inventory_audit[bar,year]": (
+            lambda n: daily.get_inventory_audit("bar", *year), False
+        ),
+        "analytics.sales_totals_async[month]": (
+            lambda n: analytics.sales_totals_async(*month), False
+        ),
+        "analytics.sales_totals_async[year]": (
+            lambda n: analytics.sales_totals_async(*year), False
+        ),
+    }
+    # day_cache-backed reports: cold and warm timings are reported separately.
+    cached: dict[str, Callable[[int], Any]] = {
+        "analytics.items_sold_async[snacks]": lambda n: analytics.items_sold_async(
+            "snacks", locked_day
+        ),
+        "audit_sales.sales_report_async[month]": lambda n: audit_sales.sales_report_async(
+            *month
+        ),
+        "audit_sales.sales_report_async[year]": lambda n: audit_sales.sales_report_async(
+            *year
+        ),
+        "tills.tills_report_async[month]": lambda n: tills.tills_report_async(*month),
+    }
+    for name, fn in cached.items():
+        cases[f"{name}[cold]"] = (fn, True)
+        cases[f"{name}[warm]"] = (fn, False)
+    return cases
+
+
+def _compare(results: dict[str, Any], baseline_path: Path, tolerance: float) -> int:
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))["results"]
+    regressions = 0
+    for name, current in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        ratio = current["median_ms"] / max(before["median_ms"], 0.01)
+        more_queries = current["queries"] > before["queries"]
+        if ratio > 1 + tolerance or more_queries:
+            regressions += 1
+            print(
+                f"REGRESSION {name}: median {before['median_ms']} -> {current['median_ms']} ms"
+                f" ({ratio:.2f}x), queries {before['queries']} -> {current['queries']}"
+            )
+    return regressions
+
+
+def main() -> None:
+    from benchmarks.dataset import DEFAULT_END
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--end", type=date.fromisoformat, default=DEFAULT_END)
+    parser.add_argument("--skip-generate", action="store_true", help="reuse existing data")
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    parser.add_argument("--compare", type=Path, help="baseline JSON to check against")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25,
+        help="allowed median slowdown vs --compare (0.25 = 25%%)",
+    )
+    parser.add_argument("--allow-remote", action="store_true")
+    args = parser.parse_args()
+
+    _configure_env(args.allow_remote)
+    from benchmarks.dataset import apply_migrations, generate
+    from db.async_connection import close_async_pool, close_async_transaction_pool
+    from db.connection import close_pool, close_transaction_pool, get_conn
+
+    meta: dict[str, Any] = {"years": args.years, "seed": args.seed, "repeat": args.repeat}
+    with get_conn() as conn:
+        apply_migrations(conn)
+        if not args.skip_generate:
+            print(f"Generating {args.years} years of synthetic data (seed {args.seed})...")
+            meta["dataset"] = generate(conn, args.years, args.seed, args.end)
+        meta["postgres"] = conn.execute("SHOW server_version").fetchone()["server_version"]
+    meta["python"] = platform.python_version()
+    meta["generated_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    results: dict[str, Any] = {}
+    # One loop for every async case, so the async pools stay open between calls.
+    runner = asyncio.Runner()
+
+    def run(result: Any) -> Any:
+        if inspect.isawaitable(result):
+            # Copy the caller's context so the coroutine records into its RequestStats.
+            return runner.run(result, context=contextvars.copy_context())
+        return result
+
+    try:
+        for name, (fn, cold) in _cases(args.end).items():
+            results[name] = _time_case(run, fn, cold, args.repeat)
+            r = results[name]
+            print(
+                f"{name:<50} median {r['median_ms']:>9.2f} ms"
+                f"  p95 {r['p95_ms']:>9.2f} ms  {r['queries']:>4} queries"
+            )
+    finally:
+        runner.run(close_async_transaction_pool())
+        runner.run(close_async_pool())
+        runner.close()
+        close_transaction_pool()
+        close_pool()
+
+    if args.output:
+        args.output.write_text(
+            json.dumps({"meta": meta, "results": results}, indent=2) + "\n", encoding="utf-8"
+        )
+        print(f"Wrote {args.output}")
+    if args.compare and _compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
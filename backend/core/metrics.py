@@ -0,0 +1,155 @@
+"""In-process metrics rendered in the Prometheus text exposition format.
+
+No client library: a Counter or Histogram is a dict keyed by label values
+behind its own lock, held only for a dict update. Histograms keep
+per-bucket counts and are made cumulative at scrape time. Values that already
+live elsewhere (pool stats) are read by collectors when /metrics is scraped.
+"""
+
+from bisect import bisect_left
+from threading import Lock
+from typing import Callable, Iterable, Sequence
+
+# (name suffix, labels, value) triples for one metric family.
+Samples = Iterable[tuple[str, dict[str, str], float]]
+# (name, type, help, samples) produced by a collector at scrape time.
+Family = tuple[str, str, str, Samples]
+
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+    return "{" + inner + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = Lock()
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def families(self) -> list[Family]:
+        with self._lock:
+            values = list(self._values.items())
+        samples = [("", dict(zip(self.labelnames, k)), v) for k, v in values]
+        return [(self.name, "counter", self.help, samples)]
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DURATION_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._values: dict[tuple[str, ...], list[float]] = {}
+        self._lock = Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(labels)
+            if row is None:
+                row = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            row[index] += 1
+            row[-1] += value
+
+    def families(self) -> list[Family]:
+        with self._lock:
+            values = [(k, list(v)) for k, v in self._values.items()]
+        samples: list[tuple[str, dict[str, str], float]] = []
+        for key, row in values:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), row[:-1]):
+                cumulative += count
+                samples.append(
+                    ("_bucket", {**labels, "le": _format_value(float(bound))}, cumulative)
+                )
+            samples.append(("_sum", labels, row[-1]))
+            samples.append(("_count", labels, cumulative))
+        return [(self.name, "histogram", self.help, samples)]
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list = []
+        self._collectors: list[Callable[[], Iterable[Family]]] = []
+        self._lock = Lock()
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help_text, labelnames)
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DURATION_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, help_text, labelnames, buckets)
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collect: Callable[[], Iterable[Family]]) -> None:
+        """Register a function producing metric families when scraped."""
+        with self._lock:
+            self._collectors.append(collect)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics, collectors = list(self._metrics), list(self._collectors)
+        families: list[Family] = []
+        for metric in metrics:
+            families.extend(metric.families())
+        for collect in collectors:
+            families.extend(collect())
+        lines: list[str] = []
+        for name, kind, help_text, samples in families:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+CACHE_REQUESTS = REGISTRY.counter(
+    "hotel_cache_requests_total",
+    "In-process cache lookups by cache and result (hit/miss).",
+    ("cache", "result"),
+)
+
+
+def cache_result(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache, "hit" if hit else "miss")
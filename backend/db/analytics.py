@@ -1,9 +1,16 @@
-"""Admin analytics aggregations for snacks, drinks, food, and kuku sales."""
+"""Admin analytics aggregations for snacks, drinks, food, and kuku sales.
 
+Reads the daily_item_sales rollup (db/sales_rollup.py).
+"""
+
+import asyncio
 from datetime import date
 from typing import Any
 
-from db.connection import get_conn
+from core.roles import MODULE_FOOD_KUKU, MODULE_SNACKS_DRINKS
+from db.async_connection import get_async_conn
+from db.daily import locked_days_async
+from db.day_cache import day_cache
 
 GROUP_LABELS = {
     "snacks": "Snacks",
@@ -22,100 +29,31 @@ def _empty_groups() -> list[dict[str, Any]]:
     ]
 
 
-def sales_totals(date_from: date, date_to: date) -> dict[str, Any]:
-    groups = {g["key"]: g for g in _empty_groups()}
+_SALES_TOTALS_SQL = """
+    SELECT category, SUM(sold_units) AS sold_units, SUM(revenue) AS revenue
+    FROM daily_item_sales
+    WHERE entry_date BETWEEN %s AND %s
+    GROUP BY category
+    """
+
+_ITEMS_SOLD_SQL = """
+    SELECT s.item_id, i.name, s.sold_units, s.revenue
+    FROM daily_item_sales s
+    JOIN items i ON i.id = s.item_id
+    WHERE s.entry_date = %s
+      AND s.category = %s
+      AND s.sold_units > 0
+    ORDER BY s.sold_units DESC, i.name
+    """
 
-    with get_conn() as conn:
-        snacks_rows = conn.execute(
-            """
-            SELECT i.subcategory AS category,
-                   SUM(
-                     GREATEST(
-                       COALESCE(prev.closing_stock, 0)
-                         + COALESCE(cur.added_stock, 0)
-                         - cur.closing_stock,
-                       0
-                     )
-                   ) AS sold_units,
-                   SUM(
-                     GREATEST(
-                       COALESCE(prev.closing_stock, 0)
-                         + COALESCE(cur.added_stock, 0)
-                         - cur.closing_stock,
-                       0
-                     )
-                     * COALESCE(
-                     (SELECT ip.price_ksh FROM item_prices ip
-                      WHERE ip.item_id = i.id
-                        AND ip.effective_from <= cur.entry_date
-                      ORDER BY ip.effective_from DESC, ip.id DESC
-                      LIMIT 1),
-                     (SELECT ip.price_ksh FROM item_prices ip
-                      WHERE ip.item_id = i.id
-                      ORDER BY ip.effective_from ASC, ip.id ASC
-                      LIMIT 1),
-                     0
-                   )
-                   ) AS revenue
-            FROM snacks_drinks_daily cur
-            JOIN items i ON i.id = cur.item_id
-            LEFT JOIN snacks_drinks_daily prev
-              ON prev.item_id = cur.item_id
-             AND prev.entry_date = (cur.entry_date - INTERVAL '1 day')::date
-            WHERE cur.entry_date BETWEEN %s AND %s
-              AND cur.closing_stock IS NOT NULL
-              AND i.group_type = 'snacks_drinks'
-              AND i.subcategory IN ('snacks', 'drinks')
-            GROUP BY i.subcategory
-            """,
-            (date_from, date_to),
-        ).fetchall()
-
-        for row in snacks_rows:
-            key = row["category"]
-            if key in groups:
-                groups[key]["sold_units"] = float(row["sold_units"] or 0)
-                groups[key]["revenue"] = float(row["revenue"] or 0)
-
-        food_rows = conn.execute(
-            """
-            SELECT
-              CASE
-                WHEN LOWER(i.name) LIKE '%%kuku%%' THEN 'kuku'
-                ELSE 'food'
-              END AS category,
-              SUM(COALESCE(f.quantity, 0)) AS sold_units,
-              SUM(
-                COALESCE(f.quantity, 0)
-                * COALESCE(
-                     (SELECT ip.price_ksh FROM item_prices ip
-                      WHERE ip.item_id = i.id
-                        AND ip.effective_from <= f.entry_date
-                      ORDER BY ip.effective_from DESC, ip.id DESC
-                      LIMIT 1),
-                     (SELECT ip.price_ksh FROM item_prices ip
-                      WHERE ip.item_id = i.id
-                      ORDER BY ip.effective_from ASC, ip.id ASC
-                      LIMIT 1),
-                     0
-                   )
-              ) AS revenue
-            FROM food_kuku_daily f
-            JOIN items i ON i.id = f.item_id
-            WHERE f.entry_date BETWEEN %s AND %s
-              AND i.group_type = 'food_kuku'
-              AND COALESCE(f.quantity, 0) > 0
-            GROUP BY 1
-            """,
-            (date_from, date_to),
-        ).fetchall()
-
-        for row in food_rows:
-            key = row["category"]
-            if key in groups:
-                groups[key]["sold_units"] = float(row["sold_units"] or 0)
-                groups[key]["revenue"] = float(row["revenue"] or 0)
 
+def _sales_totals_result(date_from: date, date_to: date, rows) -> dict[str, Any]:
+    groups = {g["key"]: g for g in _empty_groups()}
+    for row in rows:
+        key = row["category"]
+        if key in groups:
+            groups[key]["sold_units"] = float(row["sold_units"] or 0)
+            groups[key]["revenue"] = float(row["revenue"] or 0)
     return {
         "date_from": str(date_from),
         "date_to": str(date_to),
@@ -123,104 +61,52 @@ def sales_totals(date_from: date, date_to: date) -> dict[str, Any]:
     }
 
 
-def items_sold(category: str, entry_date: date) -> dict[str, Any]:
+async def _fetch_async(query: str, params: tuple) -> list:
+    async with get_async_conn() as conn:
+        cur = await conn.execute(query, params)
+        return await cur.fetchall()
+
+
+async def sales_totals_async(date_from: date, date_to: date) -> dict[str, Any]:
+    rows = await _fetch_async(_SALES_TOTALS_SQL, (date_from, date_to))
+    return _sales_totals_result(date_from, date_to, rows)
+
+
+def _check_category(category: str) -> None:
     if category not in VALID_CATEGORIES:
         raise ValueError(f"Invalid category: {category}")
 
-    with get_conn() as conn:
-        if category in ("snacks", "drinks"):
-            rows = conn.execute(
-                """
-                SELECT i.id AS item_id, i.name,
-                       GREATEST(
-                         COALESCE(prev.closing_stock, 0)
-                           + COALESCE(cur.added_stock, 0)
-                           - cur.closing_stock,
-                         0
-                       ) AS sold_units,
-                       GREATEST(
-                         COALESCE(prev.closing_stock, 0)
-                           + COALESCE(cur.added_stock, 0)
-                           - cur.closing_stock,
-                         0
-                       )
-                       * COALESCE(
-                     (SELECT ip.price_ksh FROM item_prices ip
-                      WHERE ip.item_id = i.id
-                        AND ip.effective_from <= cur.entry_date
-                      ORDER BY ip.effective_from DESC, ip.id DESC
-                      LIMIT 1),
-                     (SELECT ip.price_ksh FROM item_prices ip
-                      WHERE ip.item_id = i.id
-                      ORDER BY ip.effective_from ASC, ip.id ASC
-                      LIMIT 1),
-                     0
-                   ) AS revenue
-                FROM snacks_drinks_daily cur
-                JOIN items i ON i.id = cur.item_id
-                LEFT JOIN snacks_drinks_daily prev
-                  ON prev.item_id = cur.item_id
-                 AND prev.entry_date = (cur.entry_date - INTERVAL '1 day')::date
-                WHERE cur.entry_date = %s
-                  AND cur.closing_stock IS NOT NULL
-                  AND i.group_type = 'snacks_drinks'
-                  AND i.subcategory = %s
-                  AND GREATEST(
-                        COALESCE(prev.closing_stock, 0)
-                          + COALESCE(cur.added_stock, 0)
-                          - cur.closing_stock,
-                        0
-                      ) > 0
-                ORDER BY sold_units DESC, i.name
-                """,
-                (entry_date, category),
-            ).fetchall()
-        else:
-            kuku_filter = (
-                "AND LOWER(i.name) LIKE '%%kuku%%'"
-                if category == "kuku"
-                else "AND LOWER(i.name) NOT LIKE '%%kuku%%'"
-            )
-            rows = conn.execute(
-                f"""
-                SELECT i.id AS item_id, i.name,
-                       COALESCE(f.quantity, 0) AS sold_units,
-                       COALESCE(f.quantity, 0)
-                       * COALESCE(
-                     (SELECT ip.price_ksh FROM item_prices ip
-                      WHERE ip.item_id = i.id
-                        AND ip.effective_from <= f.entry_date
-                      ORDER BY ip.effective_from DESC, ip.id DESC
-                      LIMIT 1),
-                     (SELECT ip.price_ksh FROM item_prices ip
-                      WHERE ip.item_id = i.id
-                      ORDER BY ip.effective_from ASC, ip.id ASC
-                      LIMIT 1),
-                     0
-                   ) AS revenue
-                FROM food_kuku_daily f
-                JOIN items i ON i.id = f.item_id
-                WHERE f.entry_date = %s
-                  AND i.group_type = 'food_kuku'
-                  AND COALESCE(f.quantity, 0) > 0
-                  {kuku_filter}
-                ORDER BY sold_units DESC, i.name
-                """,
-                (entry_date,),
-            ).fetchall()
-
-        items = [
-            {
-                "item_id": int(r["item_id"]),
-                "name": r["name"],
-                "sold_units": float(r["sold_units"] or 0),
-                "revenue": float(r["revenue"] or 0),
-            }
-            for r in rows
-        ]
 
+def _items_sold_result(category: str, entry_date: date, rows) -> dict[str, Any]:
+    items = [
+        {
+            "item_id": int(r["item_id"]),
+            "name": r["name"],
+            "sold_units": float(r["sold_units"] or 0),
+            "revenue": float(r["revenue"] or 0),
+        }
+        for r in rows
+    ]
     return {
         "category": category,
         "date": str(entry_date),
         "items": items,
     }
+
+
+async def items_sold_async(category: str, entry_date: date) -> dict[str, Any]:
+    _check_category(category)
+    module = MODULE_SNACKS_DRINKS if category in ("snacks", "drinks") else MODULE_FOOD_KUKU
+    cache_key = ("items-sold", category, entry_date)
+    version = day_cache.version(entry_date, (module,))
+    cached = day_cache.get(cache_key, version)
+    if cached is not None:
+        return cached
+    rows, locked = await asyncio.gather(
+        _fetch_async(_ITEMS_SOLD_SQL, (entry_date, category)),
+        locked_days_async([entry_date]),
+    )
+    result = _items_sold_result(category, entry_date, rows)
+    if locked[entry_date][module]:
+        day_cache.put(cache_key, version, result)
+    return result
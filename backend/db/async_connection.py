@@ -0,0 +1,124 @@
+"""Async psycopg pools for the read path of `async def` routes.
+
+Mirrors db.connection: same URLs and connection kwargs, one pool for the
+hotel DB and an optional one for TRANSACTION_DATABASE_URL. Pools are opened
+in the app lifespan; writes still go through the sync pool.
+"""
+
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, Optional
+
+import psycopg
+from psycopg_pool import AsyncConnectionPool
+
+from db.connection import (
+    PoolSettings,
+    _pool_kwargs,
+    get_database_url,
+    get_transaction_database_url,
+    pool_settings,
+)
+from db.instrumentation import (
+    InstrumentedAsyncCursor,
+    check_async_connection,
+    record_pool_wait,
+)
+
+_async_pool: Optional[AsyncConnectionPool] = None
+_async_transaction_pool: Optional[AsyncConnectionPool] = None
+
+
+def _new_pool(name: str, url: str, settings: PoolSettings) -> AsyncConnectionPool:
+    return AsyncConnectionPool(
+        conninfo=url,
+        name=name,
+        min_size=settings.min_size,
+        max_size=settings.max_size,
+        timeout=settings.timeout,
+        max_waiting=settings.max_waiting,
+        # Same Neon idle handling as the sync pools.
+        max_idle=300,
+        check=check_async_connection,
+        kwargs={**_pool_kwargs(), "cursor_factory": InstrumentedAsyncCursor},
+        open=False,
+    )
+
+
+async def init_async_pool() -> None:
+    """Open the async hotel DB pool; sizes come from ASYNC_DB_POOL_* (1..20)."""
+    global _async_pool
+    if _async_pool is not None:
+        return
+    pool = _new_pool("hotel-async", get_database_url(), pool_settings("ASYNC_DB_POOL", 1, 20))
+    await pool.open()
+    _async_pool = pool
+
+
+async def close_async_pool() -> None:
+    global _async_pool
+    if _async_pool is not None:
+        await _async_pool.close()
+        _async_pool = None
+
+
+async def init_async_transaction_pool() -> None:
+    """Init optional async pool for TRANSACTION_DATABASE_URL (Tills). No-op if unset.
+
+    Sizes come from ASYNC_TRANSACTION_DB_POOL_* (1..5).
+    """
+    global _async_transaction_pool
+    if _async_transaction_pool is not None:
+        return
+    url = get_transaction_database_url()
+    if not url:
+        return
+    pool = _new_pool(
+        "transactions-async", url, pool_settings("ASYNC_TRANSACTION_DB_POOL", 1, 5)
+    )
+    await pool.open()
+    _async_transaction_pool = pool
+
+
+async def close_async_transaction_pool() -> None:
+    global _async_transaction_pool
+    if _async_transaction_pool is not None:
+        await _async_transaction_pool.close()
+        _async_transaction_pool = None
+
+
+def open_async_pools() -> list[AsyncConnectionPool]:
+    return [p for p in (_async_pool, _async_transaction_pool) if p is not None]
+
+
+async def get_async_pool() -> AsyncConnectionPool:
+    if _async_pool is None:
+        await init_async_pool()
+    assert _async_pool is not None
+    return _async_pool
+
+
+async def get_async_transaction_pool() -> Optional[AsyncConnectionPool]:
+    if _async_transaction_pool is None:
+        await init_async_transaction_pool()
+    return _async_transaction_pool
+
+
+@asynccontextmanager
+async def get_async_conn() -> AsyncGenerator[psycopg.AsyncConnection, None]:
+    pool = await get_async_pool()
+    start = time.perf_counter()
+    async with pool.connection() as conn:
+        record_pool_wait(time.perf_counter() - start)
+        yield conn
+
+
+@asynccontextmanager
+async def get_async_transaction_conn() -> AsyncGenerator[psycopg.AsyncConnection, None]:
+    pool = await get_async_transaction_pool()
+    if pool is None:
+        raise RuntimeError("TRANSACTION_DATABASE_URL is not set")
+    start = time.perf_counter()
+    async with pool.connection() as conn:
+        record_pool_wait(time.perf_counter() - start)
+        yield conn
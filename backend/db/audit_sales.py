@@ -1,5 +1,6 @@
-"""Question-driven sales audit aggregations."""
+"""Question-driven sales audit aggregations over the daily_item_sales rollup."""
 
+import asyncio
 from datetime import date, timedelta
 from typing import Any
 
@@ -10,7 +11,10 @@ from core.dish_rules import (
     classify,
     is_chapati_dish,
 )
-from db.connection import get_conn
+from core.roles import MODULE_FOOD_KUKU, MODULE_SNACKS_DRINKS
+from db.async_connection import get_async_conn
+from db.daily import locked_days_async
+from db.day_cache import day_cache
 
 
 def _date_keys(date_from: date, date_to: date) -> list[str]:
@@ -18,78 +22,85 @@ def _date_keys(date_from: date, date_to: date) -> list[str]:
     return [str(date_from + timedelta(days=offset)) for offset in range(days + 1)]
 
 
-def _food_rows(date_from: date, date_to: date) -> list[dict[str, Any]]:
-    with get_conn() as conn:
-        rows = conn.execute(
-            """
-            SELECT f.entry_date, i.id AS item_id, i.name AS item_name,
-                   COALESCE(f.quantity, 0) AS quantity,
-                   COALESCE(
-                     (SELECT ip.price_ksh FROM item_prices ip
-                      WHERE ip.item_id = i.id
-                        AND ip.effective_from <= f.entry_date
-                      ORDER BY ip.effective_from DESC, ip.id DESC
-                      LIMIT 1),
-                     (SELECT ip.price_ksh FROM item_prices ip
-                      WHERE ip.item_id = i.id
-                      ORDER BY ip.effective_from ASC, ip.id ASC
-                      LIMIT 1),
-                     0
-                   ) AS price_ksh
-            FROM food_kuku_daily f
-            JOIN items i ON i.id = f.item_id
-            WHERE f.entry_date BETWEEN %s AND %s
-              AND i.group_type = 'food_kuku'
-              AND COALESCE(f.quantity, 0) > 0
-            ORDER BY f.entry_date, i.name
-            """,
-            (date_from, date_to),
-        ).fetchall()
-    return [dict(row) for row in rows]
-
-
-def _snacks_rows(date_from: date, date_to: date) -> list[dict[str, Any]]:
-    with get_conn() as conn:
-        rows = conn.execute(
-            """
-            SELECT cur.entry_date, i.id AS item_id, i.name AS item_name,
-                   i.subcategory,
-                   COALESCE(prev.closing_stock, 0) AS opening_stock,
-                   COALESCE(cur.added_stock, 0) AS added_stock,
-                   cur.closing_stock,
-                   COALESCE(
-                     (SELECT ip.price_ksh FROM item_prices ip
-                      WHERE ip.item_id = i.id
-                        AND ip.effective_from <= cur.entry_date
-                      ORDER BY ip.effective_from DESC, ip.id DESC
-                      LIMIT 1),
-                     (SELECT ip.price_ksh FROM item_prices ip
-                      WHERE ip.item_id = i.id
-                      ORDER BY ip.effective_from ASC, ip.id ASC
-                      LIMIT 1),
-                     0
-                   ) AS price_ksh
-            FROM snacks_drinks_daily cur
-            JOIN items i ON i.id = cur.item_id
-            LEFT JOIN snacks_drinks_daily prev
-              ON prev.item_id = cur.item_id
-             AND prev.entry_date = (cur.entry_date - INTERVAL '1 day')::date
-            WHERE cur.entry_date BETWEEN %s AND %s
-              AND cur.closing_stock IS NOT NULL
-              AND i.group_type = 'snacks_drinks'
-              AND i.subcategory IN ('snacks', 'drinks')
-            ORDER BY cur.entry_date, i.name
-            """,
-            (date_from, date_to),
-        ).fetchall()
-    return [dict(row) for row in rows]
-
-
-def sales_report(date_from: date, date_to: date) -> dict[str, Any]:
+_FOOD_DAY_ROWS_SQL = """
+    SELECT s.entry_date, s.item_id, i.name AS item_name,
+           s.sold_units AS quantity, s.revenue
+    FROM daily_item_sales s
+    JOIN items i ON i.id = s.item_id
+    WHERE s.entry_date = ANY(%s::date[])
+      AND s.category IN ('food', 'kuku')
+    ORDER BY s.entry_date, i.name
+    """
+
+_SNACKS_DAY_ROWS_SQL = """
+    SELECT s.entry_date, s.item_id, i.name AS item_name,
+           s.category AS subcategory,
+           s.added_stock, s.sold_units, s.revenue
+    FROM daily_item_sales s
+    JOIN items i ON i.id = s.item_id
+    WHERE s.entry_date = ANY(%s::date[])
+      AND s.category IN ('snacks', 'drinks')
+    ORDER BY s.entry_date, i.name
+    """
+
+# A day's report rows depend on both modules' data for that day.
+_REPORT_MODULES = (MODULE_FOOD_KUKU, MODULE_SNACKS_DRINKS)
+
+
+async def _fetch_rows_async(query: str, params: tuple) -> list[dict[str, Any]]:
+    async with get_async_conn() as conn:
+        cur = await conn.execute(query, params)
+        return await cur.fetchall()
+
+
+async def _report_rows_async(
+    date_from: date, date_to: date
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """Food and snacks rollup rows for the range; finalized days come from day_cache."""
+    days = [date_from + timedelta(days=n) for n in range((date_to - date_from).days + 1)]
+    versions = {day: day_cache.version(day, _REPORT_MODULES) for day in days}
+    by_day: dict[date, tuple[list, list]] = {}
+    for day in days:
+        cached = day_cache.get(("sales-rows", day), versions[day])
+        if cached is not None:
+            by_day[day] = cached
+    missing = [day for day in days if day not in by_day]
+    if missing:
+        # Independent queries on separate pooled connections: wall time is the slowest one.
+        food_rows, snacks_rows, locked = await asyncio.gather(
+            _fetch_rows_async(_FOOD_DAY_ROWS_SQL, (missing,)),
+            _fetch_rows_async(_SNACKS_DAY_ROWS_SQL, (missing,)),
+            locked_days_async(missing),
+        )
+        fresh: dict[date, tuple[list, list]] = {day: ([], []) for day in missing}
+        for row in food_rows:
+            fresh[row["entry_date"]][0].append(row)
+        for row in snacks_rows:
+            fresh[row["entry_date"]][1].append(row)
+        for day, rows in fresh.items():
+            if all(locked[day].values()):
+                day_cache.put(("sales-rows", day), versions[day], rows)
+        by_day.update(fresh)
+    food: list[dict[str, Any]] = []
+    snacks: list[dict[str, Any]] = []
+    for day in days:
+        food.extend(by_day[day][0])
+        snacks.extend(by_day[day][1])
+    return food, snacks
+
+
+async def sales_report_async(date_from: date, date_to: date) -> dict[str, Any]:
     """Build the complete sales-audit response for an inclusive date range."""
-    food_rows = _food_rows(date_from, date_to)
-    snacks_rows = _snacks_rows(date_from, date_to)
+    food_rows, snacks_rows = await _report_rows_async(date_from, date_to)
+    return _build_sales_report(date_from, date_to, food_rows, snacks_rows)
+
 
+def _build_sales_report(
+    date_from: date,
+    date_to: date,
+    food_rows: list[dict[str, Any]],
+    snacks_rows: list[dict[str, Any]],
+) -> dict[str, Any]:
     category_totals = {
         key: {
             "key": key,
@@ -118,7 +129,7 @@ def sales_report(date_from: date, date_to: date) -> dict[str, Any]:
         item_name = str(row["item_name"])
         entry_date = str(row["entry_date"])
         quantity = float(row["quantity"] or 0)
-        revenue = quantity * float(row["price_ksh"] or 0)
+        revenue = float(row["revenue"] or 0)
 
         chart_group = "kuku" if "kuku" in item_name.casefold() else "food"
         timeseries[entry_date][chart_group] += revenue
@@ -153,11 +164,9 @@ def sales_report(date_from: date, date_to: date) -> dict[str, Any]:
         item_name = str(row["item_name"])
         entry_date = str(row["entry_date"])
         subcategory = str(row["subcategory"])
-        opening = float(row["opening_stock"] or 0)
         added = float(row["added_stock"] or 0)
-        closing = float(row["closing_stock"] or 0)
-        sold = max(opening + added - closing, 0.0)
-        revenue = sold * float(row["price_ksh"] or 0)
+        sold = float(row["sold_units"] or 0)
+        revenue = float(row["revenue"] or 0)
 
         timeseries[entry_date][subcategory] += revenue
 
@@ -1,14 +1,21 @@
 import os
+import time
 from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Generator, Optional
+from threading import BoundedSemaphore, Lock
+from typing import Any, Generator, Optional
 
 import psycopg
 from psycopg.rows import dict_row
 from psycopg_pool import ConnectionPool
 
+from db.instrumentation import InstrumentedCursor, check_connection, record_pool_wait
+
 _pool: Optional[ConnectionPool] = None
 _transaction_pool: Optional[ConnectionPool] = None
+_stream_slots: Optional[BoundedSemaphore] = None
+_stream_slots_lock = Lock()
 _env_loaded = False
 
 
@@ -71,6 +78,8 @@ def _pool_kwargs() -> dict:
     # Neon / poolers drop idle SSL sockets; TCP keepalives reduce surprise closes.
     return {
         "row_factory": dict_row,
+        # Counts statements and DB time per request (db.instrumentation).
+        "cursor_factory": InstrumentedCursor,
         "keepalives": 1,
         "keepalives_idle": 30,
         "keepalives_interval": 10,
@@ -78,22 +87,60 @@ def _pool_kwargs() -> dict:
     }
 
 
-def init_pool(min_size: int = 1, max_size: int = 10) -> None:
-    global _pool
-    if _pool is not None:
-        return
-    _pool = ConnectionPool(
-        conninfo=get_database_url(),
+def _env_number(name: str, default, cast):
+    try:
+        return cast(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    min_size: int
+    max_size: int
+    # Seconds a checkout may wait before PoolTimeout.
+    timeout: float
+    # Queued checkouts allowed before new requests fail fast (0 = unbounded).
+    max_waiting: int
+
+
+def pool_settings(prefix: str, min_size: int, max_size: int) -> PoolSettings:
+    """Read <prefix>_MIN_SIZE, _MAX_SIZE, _TIMEOUT_SEC, _MAX_WAITING from the env."""
+    load_env_file()
+    min_size = _env_number(f"{prefix}_MIN_SIZE", min_size, int)
+    max_size = max(min_size, _env_number(f"{prefix}_MAX_SIZE", max_size, int))
+    return PoolSettings(
         min_size=min_size,
         max_size=max_size,
+        timeout=_env_number(f"{prefix}_TIMEOUT_SEC", 30.0, float),
+        max_waiting=_env_number(f"{prefix}_MAX_WAITING", 0, int),
+    )
+
+
+def _new_pool(name: str, url: str, settings: PoolSettings) -> ConnectionPool:
+    return ConnectionPool(
+        conninfo=url,
+        name=name,
+        min_size=settings.min_size,
+        max_size=settings.max_size,
+        timeout=settings.timeout,
+        max_waiting=settings.max_waiting,
         # Discard connections idle too long (Neon often closes ~5m).
         max_idle=300,
-        # Verify connection is alive before handing it to the app.
-        check=ConnectionPool.check_connection,
+        # Verify connection is alive before handing it to the app (uncounted ping).
+        check=check_connection,
         kwargs=_pool_kwargs(),
     )
 
 
+def init_pool() -> None:
+    """Open the hotel DB pool; sizes come from DB_POOL_* (1..10)."""
+    global _pool
+    if _pool is not None:
+        return
+    _pool = _new_pool("hotel", get_database_url(), pool_settings("DB_POOL", 1, 10))
+
+
 def close_pool() -> None:
     global _pool
     if _pool is not None:
@@ -101,21 +148,19 @@ def close_pool() -> None:
         _pool = None
 
 
-def init_transaction_pool(min_size: int = 1, max_size: int = 5) -> None:
-    """Init optional pool for TRANSACTION_DATABASE_URL (Tills). No-op if unset."""
+def init_transaction_pool() -> None:
+    """Init optional pool for TRANSACTION_DATABASE_URL (Tills). No-op if unset.
+
+    Sizes come from TRANSACTION_DB_POOL_* (1..5).
+    """
     global _transaction_pool
     if _transaction_pool is not None:
         return
     url = get_transaction_database_url()
     if not url:
         return
-    _transaction_pool = ConnectionPool(
-        conninfo=url,
-        min_size=min_size,
-        max_size=max_size,
-        max_idle=300,
-        check=ConnectionPool.check_connection,
-        kwargs=_pool_kwargs(),
+    _transaction_pool = _new_pool(
+        "transactions", url, pool_settings("TRANSACTION_DB_POOL", 1, 5)
     )
 
 
@@ -133,6 +178,35 @@ def get_pool() -> ConnectionPool:
     return _pool
 
 
+def open_pools() -> list[ConnectionPool]:
+    return [p for p in (_pool, _transaction_pool) if p is not None]
+
+
+_STAT_COUNTERS = (
+    "requests_num",
+    "requests_queued",
+    "requests_wait_ms",
+    "requests_errors",
+    "requests_waiting",
+    "usage_ms",
+    "returns_bad",
+    "connections_num",
+    "connections_ms",
+    "connections_errors",
+    "connections_lost",
+)
+
+
+def describe_pool(pool: Any) -> dict[str, Any]:
+    """psycopg_pool get_stats() with unset counters as 0, plus derived in_use."""
+    stats = {key: 0 for key in _STAT_COUNTERS}
+    stats.update(pool.get_stats())
+    stats["in_use"] = stats["pool_size"] - stats["pool_available"]
+    stats["timeout_sec"] = pool.timeout
+    stats["max_waiting"] = pool.max_waiting
+    return stats
+
+
 def get_transaction_pool() -> Optional[ConnectionPool]:
     if _transaction_pool is None:
         init_transaction_pool()
@@ -140,9 +214,21 @@ def get_transaction_pool() -> Optional[ConnectionPool]:
 
 
 @contextmanager
-def get_conn() -> Generator[psycopg.Connection, None, None]:
+def get_conn(pipeline: bool = False) -> Generator[psycopg.Connection, None, None]:
+    """Borrow a pooled connection.
+
+    pipeline=True runs the block in psycopg pipeline mode: statements whose
+    results are not fetched are queued and sent together, so a multi-statement
+    transaction pays one round trip per fetch instead of one per execute.
+    """
+    start = time.perf_counter()
     with get_pool().connection() as conn:
-        yield conn
+        record_pool_wait(time.perf_counter() - start)
+        if pipeline:
+            with conn.pipeline():
+                yield conn
+        else:
+            yield conn
 
 
 @contextmanager
@@ -150,5 +236,54 @@ def get_transaction_conn() -> Generator[psycopg.Connection, None, None]:
     pool = get_transaction_pool()
     if pool is None:
         raise RuntimeError("TRANSACTION_DATABASE_URL is not set")
+    start = time.perf_counter()
     with pool.connection() as conn:
+        record_pool_wait(time.perf_counter() - start)
         yield conn
+
+
+class StreamBusyError(RuntimeError):
+    """Raised when every streaming connection stays busy past DB_STREAM_TIMEOUT_SEC."""
+
+
+def _get_stream_slots() -> BoundedSemaphore:
+    global _stream_slots
+    with _stream_slots_lock:
+        if _stream_slots is None:
+            load_env_file()
+            _stream_slots = BoundedSemaphore(
+                max(1, _env_number("DB_STREAM_MAX_CONNECTIONS", 4, int))
+            )
+        return _stream_slots
+
+
+@contextmanager
+def get_stream_conn() -> Generator[psycopg.Connection, None, None]:
+    """Dedicated hotel DB connection for a download paced by the client.
+
+    Not taken from the shared pool, so slow clients cannot starve the save
+    paths; at most DB_STREAM_MAX_CONNECTIONS (4) are open at once. The
+    transaction is capped by DB_STREAM_STATEMENT_TIMEOUT_SEC (60) per fetch
+    and DB_STREAM_IDLE_TIMEOUT_SEC (30) between fetches, after which the
+    server ends it.
+    """
+    slots = _get_stream_slots()
+    start = time.perf_counter()
+    if not slots.acquire(timeout=_env_number("DB_STREAM_TIMEOUT_SEC", 30.0, float)):
+        raise StreamBusyError("no streaming connection available")
+    try:
+        with psycopg.connect(get_database_url(), **_pool_kwargs()) as conn:
+            record_pool_wait(time.perf_counter() - start)
+            conn.execute(
+                """
+                SELECT set_config('statement_timeout', %s, true),
+                       set_config('idle_in_transaction_session_timeout', %s, true)
+                """,
+                (
+                    f"{_env_number('DB_STREAM_STATEMENT_TIMEOUT_SEC', 60, int)}s",
+                    f"{_env_number('DB_STREAM_IDLE_TIMEOUT_SEC', 30, int)}s",
+                ),
+            )
+            yield conn
+    finally:
+        slots.release()
@@ -1,7 +1,12 @@
-from datetime import date
-from typing import Any, Optional
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Iterator, Optional
 
-from db.connection import get_conn
+from core.roles import MODULE_FOOD_KUKU, MODULE_SNACKS_DRINKS
+from db.async_connection import get_async_conn
+from db.connection import get_conn, get_stream_conn
+from db.day_cache import day_cache
+from db.price_sql import price_as_of_join, price_timeline
+from db.sales_rollup import refresh_sales_for_dates
 
 
 def _assert_items_in_group(
@@ -26,33 +31,39 @@ def _assert_items_in_group(
         )
 
 
-def log_audit(
+_INSERT_AUDIT_ROWS_SQL = """
+    INSERT INTO inventory_audit_log
+      (table_name, record_id, item_id, entry_date, field_name,
+       old_value, new_value, changed_by)
+    SELECT %s, u.record_id, u.item_id, %s, u.field_name,
+           u.old_value, u.new_value, %s
+    FROM unnest(%s::int[], %s::int[], %s::text[], %s::text[], %s::text[])
+      AS u(record_id, item_id, field_name, old_value, new_value)
+"""
+
+
+def _insert_audit_rows(
     conn,
-    *,
     table_name: str,
-    record_id: int,
-    item_id: Optional[int],
-    entry_date: Optional[date],
-    field_name: str,
-    old_value: Any,
-    new_value: Any,
+    entry_date: date,
     changed_by: int,
+    rows: list[tuple[int, int, str, Any, Any]],
 ) -> None:
+    """Write (record_id, item_id, field_name, old, new) audit rows in one INSERT."""
+    if not rows:
+        return
+    record_ids, item_ids, fields, old_values, new_values = zip(*rows)
     conn.execute(
-        """
-        INSERT INTO inventory_audit_log
-          (table_name, record_id, item_id, entry_date, field_name, old_value, new_value, changed_by)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """,
+        _INSERT_AUDIT_ROWS_SQL,
         (
             table_name,
-            record_id,
-            item_id,
             entry_date,
-            field_name,
-            None if old_value is None else str(old_value),
-            str(new_value),
             changed_by,
+            list(record_ids),
+            list(item_ids),
+            list(fields),
+            [None if v is None else str(v) for v in old_values],
+            [str(v) for v in new_values],
         ),
     )
 
@@ -85,69 +96,224 @@ def _compute_snacks_metrics(record: dict[str, Any]) -> dict[str, Any]:
     return record
 
 
+_SNACKS_DRINKS_DAILY_SQL = f"""
+    SELECT i.id AS item_id, i.name, i.subcategory,
+           COALESCE(prev.closing_stock, 0) AS previous_closing,
+           prev.entry_date AS previous_from_date,
+           cur.added_stock,
+           cur.closing_stock,
+           COALESCE(pi.price_ksh, 0) AS price_ksh,
+           cur.id AS record_id
+    FROM items i
+    LEFT JOIN snacks_drinks_daily cur
+      ON cur.item_id = i.id AND cur.entry_date = %(entry_date)s
+    LEFT JOIN snacks_drinks_daily prev
+      ON prev.item_id = i.id
+     AND prev.entry_date = (%(entry_date)s::date - INTERVAL '1 day')::date
+    {price_as_of_join("pi", "i.id", "%(entry_date)s::date")}
+    WHERE i.group_type = 'snacks_drinks' AND i.is_active = TRUE
+    ORDER BY i.subcategory NULLS LAST, i.display_order, i.name
+    """
+
+
 def get_snacks_drinks_daily(entry_date: date) -> list[dict[str, Any]]:
     with get_conn() as conn:
         rows = conn.execute(
-            """
-            SELECT i.id AS item_id, i.name, i.subcategory,
-                   COALESCE(prev.closing_stock, 0) AS previous_closing,
-                   prev.entry_date AS previous_from_date,
-                   cur.added_stock,
-                   cur.closing_stock,
-                   COALESCE(
-                     (SELECT ip.price_ksh FROM item_prices ip
-                      WHERE ip.item_id = i.id
-                        AND ip.effective_from <= %s
-                      ORDER BY ip.effective_from DESC, ip.id DESC
-                      LIMIT 1),
-                     (SELECT ip.price_ksh FROM item_prices ip
-                      WHERE ip.item_id = i.id
-                      ORDER BY ip.effective_from ASC, ip.id ASC
-                      LIMIT 1),
-                     0
-                   ) AS price_ksh,
-                   cur.id AS record_id
-            FROM items i
-            LEFT JOIN snacks_drinks_daily cur
-              ON cur.item_id = i.id AND cur.entry_date = %s
-            LEFT JOIN snacks_drinks_daily prev
-              ON prev.item_id = i.id
-             AND prev.entry_date = (%s::date - INTERVAL '1 day')::date
-            WHERE i.group_type = 'snacks_drinks' AND i.is_active = TRUE
-            ORDER BY i.subcategory NULLS LAST, i.display_order, i.name
-            """,
-            (entry_date, entry_date, entry_date),
+            _SNACKS_DRINKS_DAILY_SQL, {"entry_date": entry_date}
         ).fetchall()
         return [_compute_snacks_metrics(dict(row)) for row in rows]
 
 
+async def get_snacks_drinks_daily_async(entry_date: date) -> list[dict[str, Any]]:
+    async with get_async_conn() as conn:
+        cur = await conn.execute(_SNACKS_DRINKS_DAILY_SQL, {"entry_date": entry_date})
+        rows = await cur.fetchall()
+    return [_compute_snacks_metrics(dict(row)) for row in rows]
+
+
 def _validate_snacks_closing_not_over_total(
     conn, entry_date: date, entries: list[dict[str, Any]]
 ) -> None:
-    violations: list[str] = []
-    for entry in entries:
-        if entry.get("closing_stock") is None:
-            continue
-        item_id = int(entry["item_id"])
-        closing = float(entry["closing_stock"])
-        added = float(entry.get("added_stock") or 0)
-        prev_row = conn.execute(
-            """
-            SELECT closing_stock FROM snacks_drinks_daily
-            WHERE item_id = %s
-              AND entry_date = (%s::date - INTERVAL '1 day')::date
+    checked = [e for e in entries if e.get("closing_stock") is not None]
+    if not checked:
+        return
+    rows = conn.execute(
+        """
+        SELECT COALESCE(i.name, e.item_id::text) AS name
+        FROM unnest(%s::int[], %s::numeric[], %s::numeric[])
+          WITH ORDINALITY AS e(item_id, closing_stock, added_stock, ord)
+        LEFT JOIN items i ON i.id = e.item_id
+        LEFT JOIN snacks_drinks_daily prev
+          ON prev.item_id = e.item_id
+         AND prev.entry_date = (%s::date - INTERVAL '1 day')::date
+        WHERE e.closing_stock > COALESCE(prev.closing_stock, 0) + e.added_stock
+        ORDER BY e.ord
+        """,
+        (
+            [int(e["item_id"]) for e in checked],
+            [float(e["closing_stock"]) for e in checked],
+            [float(e.get("added_stock") or 0) for e in checked],
+            entry_date,
+        ),
+    ).fetchall()
+    if rows:
+        raise ValueError(f"closing_exceeds_total:{','.join(r['name'] for r in rows)}")
+
+
+class DayLockedError(Exception):
+    """Raised when a clerk tries to edit a finalized day."""
+
+
+# Advisory-lock namespaces for day mutations (arbitrary stable ints).
+_FOOD_KUKU_LOCK_NS = 8742001
+_SNACKS_DRINKS_LOCK_NS = 8742002
+_BAR_LOCK_NS = 8742003
+_STOCK_ITEMS_LOCK_NS = 8742004
+
+
+class DailyLedger:
+    """Write spec for one per-day, per-item table (<module>_daily)."""
+
+    def __init__(
+        self,
+        table_name: str,
+        item_group: str,
+        value_columns: tuple[str, ...],
+        lock_ns: int,
+        *,
+        sparse: bool = False,
+    ) -> None:
+        self.table_name = table_name
+        self.item_group = item_group
+        # Column order is also the audit row order for a record.
+        self.value_columns = value_columns
+        self.lock_ns = lock_ns
+        # Sparse tables store only positive rows; all-zero entries delete.
+        self.sparse = sparse
+
+
+SNACKS_DRINKS_LEDGER = DailyLedger(
+    "snacks_drinks_daily",
+    "snacks_drinks",
+    ("closing_stock", "added_stock"),
+    _SNACKS_DRINKS_LOCK_NS,
+)
+FOOD_KUKU_LEDGER = DailyLedger(
+    "food_kuku_daily",
+    "food_kuku",
+    ("quantity",),
+    _FOOD_KUKU_LOCK_NS,
+    sparse=True,
+)
+STOCK_ITEMS_LEDGER = DailyLedger(
+    "stock_items_daily",
+    "stock",
+    ("closing_stock", "added_stock"),
+    _STOCK_ITEMS_LOCK_NS,
+)
+BAR_LEDGER = DailyLedger(
+    "bar_daily",
+    "bar",
+    ("added_stock", "closing_stock"),
+    _BAR_LOCK_NS,
+)
+
+
+def _lock_ledger_day(conn, ledger: DailyLedger, entry_date: date) -> None:
+    """Serialize mutations of one ledger day until the transaction ends."""
+    day_key = int(entry_date.strftime("%Y%m%d"))
+    conn.execute(
+        "SELECT pg_advisory_xact_lock(%s, %s)",
+        (ledger.lock_ns, day_key),
+    )
+
+
+def write_daily_ledger(
+    conn,
+    ledger: DailyLedger,
+    entry_date: date,
+    values: dict[int, dict[str, float]],
+    user_id: int,
+) -> int:
+    """Apply {item_id: {column: value}} to a ledger day with bulk SQL.
+
+    One prefetch of existing rows, then at most one upsert, one delete (sparse
+    ledgers) and one multi-row audit INSERT. Field-level audit semantics:
+    every column on insert, changed columns on update, old -> 0 on delete.
+    Returns the number of rows written or deleted; the caller holds the day
+    lock and commits.
+    """
+    if not values:
+        return 0
+    table = ledger.table_name
+    columns = ledger.value_columns
+    item_ids = list(values)
+    existing_rows = conn.execute(
+        f"""
+        SELECT id, item_id, {", ".join(columns)}
+        FROM {table}
+        WHERE entry_date = %s AND item_id = ANY(%s)
+        """,
+        (entry_date, item_ids),
+    ).fetchall()
+    existing_by_item = {int(r["item_id"]): r for r in existing_rows}
+
+    zeroed = {
+        i for i in item_ids
+        if ledger.sparse and all(values[i][c] <= 0 for c in columns)
+    }
+    upserts = [i for i in item_ids if i not in zeroed]
+    deletes = [i for i in item_ids if i in zeroed and i in existing_by_item]
+
+    record_ids: dict[int, int] = {}
+    if upserts:
+        value_arrays = ", ".join("%s::numeric[]" for _ in columns)
+        unnest_columns = ", ".join(columns)
+        selected = ", ".join(f"u.{c}" for c in columns)
+        updates = ",\n              ".join(f"{c} = EXCLUDED.{c}" for c in columns)
+        upserted = conn.execute(
+            f"""
+            INSERT INTO {table}
+              (entry_date, item_id, {unnest_columns}, submitted_by)
+            SELECT %s, u.item_id, {selected}, %s
+            FROM unnest(%s::int[], {value_arrays})
+              AS u(item_id, {unnest_columns})
+            ON CONFLICT (entry_date, item_id) DO UPDATE
+              SET {updates},
+                  submitted_by = EXCLUDED.submitted_by,
+                  submitted_at = NOW()
+            RETURNING id, item_id
             """,
-            (item_id, entry_date),
-        ).fetchone()
-        previous = float(prev_row["closing_stock"]) if prev_row else 0.0
-        total = previous + added
-        if closing > total:
-            name_row = conn.execute(
-                "SELECT name FROM items WHERE id = %s", (item_id,)
-            ).fetchone()
-            violations.append(name_row["name"] if name_row else str(item_id))
-    if violations:
-        raise ValueError(f"closing_exceeds_total:{','.join(violations)}")
+            [entry_date, user_id, upserts]
+            + [[values[i][c] for i in upserts] for c in columns],
+        ).fetchall()
+        record_ids = {int(r["item_id"]): int(r["id"]) for r in upserted}
+    if deletes:
+        conn.execute(
+            f"DELETE FROM {table} WHERE id = ANY(%s)",
+            ([int(existing_by_item[i]["id"]) for i in deletes],),
+        )
+
+    audit_rows: list[tuple[int, int, str, Any, Any]] = []
+    for item_id in item_ids:
+        existing = existing_by_item.get(item_id)
+        if item_id in zeroed and existing is None:
+            continue
+        record_id = (
+            int(existing["id"]) if existing is not None else record_ids[item_id]
+        )
+        for column in columns:
+            if item_id in zeroed:
+                old_value, new_value = existing[column], 0
+            elif existing is None:
+                old_value, new_value = None, values[item_id][column]
+            elif float(existing[column]) != values[item_id][column]:
+                old_value, new_value = existing[column], values[item_id][column]
+            else:
+                continue
+            audit_rows.append((record_id, item_id, column, old_value, new_value))
+    _insert_audit_rows(conn, table, entry_date, user_id, audit_rows)
+    return len(upserts) + len(deletes)
 
 
 def save_snacks_drinks_daily(
@@ -158,13 +324,9 @@ def save_snacks_drinks_daily(
     finalize: bool = False,
     block_if_locked: bool = False,
 ) -> dict[str, Any]:
-    saved = 0
-    with get_conn() as conn:
-        day_key = int(entry_date.strftime("%Y%m%d"))
-        conn.execute(
-            "SELECT pg_advisory_xact_lock(%s, %s)",
-            (_SNACKS_DRINKS_LOCK_NS, day_key),
-        )
+    ledger = SNACKS_DRINKS_LEDGER
+    with get_conn(pipeline=True) as conn:
+        _lock_ledger_day(conn, ledger, entry_date)
         if block_if_locked and is_snacks_drinks_day_locked(entry_date):
             raise DayLockedError(
                 "This day already has sales recorded and cannot be edited."
@@ -178,80 +340,23 @@ def save_snacks_drinks_daily(
             return {"saved": 0, "locked": is_snacks_drinks_day_locked(entry_date)}
         if entries:
             _assert_items_in_group(
-                conn, [int(e["item_id"]) for e in entries], "snacks_drinks"
+                conn, [int(e["item_id"]) for e in entries], ledger.item_group
             )
             _validate_snacks_closing_not_over_total(conn, entry_date, entries)
-        for entry in entries:
-            item_id = int(entry["item_id"])
-            closing = float(entry["closing_stock"])
-            added = float(entry.get("added_stock") or 0)
-            existing = conn.execute(
-                """
-                SELECT id, closing_stock, added_stock
-                FROM snacks_drinks_daily
-                WHERE entry_date = %s AND item_id = %s
-                """,
-                (entry_date, item_id),
-            ).fetchone()
-            if existing:
-                record_id = existing["id"]
-                if float(existing["closing_stock"]) != closing:
-                    log_audit(
-                        conn,
-                        table_name="snacks_drinks_daily",
-                        record_id=record_id,
-                        item_id=item_id,
-                        entry_date=entry_date,
-                        field_name="closing_stock",
-                        old_value=existing["closing_stock"],
-                        new_value=closing,
-                        changed_by=user_id,
-                    )
-                if float(existing["added_stock"]) != added:
-                    log_audit(
-                        conn,
-                        table_name="snacks_drinks_daily",
-                        record_id=record_id,
-                        item_id=item_id,
-                        entry_date=entry_date,
-                        field_name="added_stock",
-                        old_value=existing["added_stock"],
-                        new_value=added,
-                        changed_by=user_id,
-                    )
-                conn.execute(
-                    """
-                    UPDATE snacks_drinks_daily
-                    SET closing_stock = %s, added_stock = %s,
-                        submitted_by = %s, submitted_at = NOW()
-                    WHERE id = %s
-                    """,
-                    (closing, added, user_id, record_id),
-                )
-            else:
-                row = conn.execute(
-                    """
-                    INSERT INTO snacks_drinks_daily
-                      (entry_date, item_id, closing_stock, added_stock, submitted_by)
-                    VALUES (%s, %s, %s, %s, %s)
-                    RETURNING id
-                    """,
-                    (entry_date, item_id, closing, added, user_id),
-                ).fetchone()
-                record_id = row["id"]
-                for field, val in [("closing_stock", closing), ("added_stock", added)]:
-                    log_audit(
-                        conn,
-                        table_name="snacks_drinks_daily",
-                        record_id=record_id,
-                        item_id=item_id,
-                        entry_date=entry_date,
-                        field_name=field,
-                        old_value=None,
-                        new_value=val,
-                        changed_by=user_id,
-                    )
-            saved += 1
+        values = {
+            int(e["item_id"]): {
+                "closing_stock": float(e["closing_stock"]),
+                "added_stock": float(e.get("added_stock") or 0),
+            }
+            for e in entries
+        }
+        saved = write_daily_ledger(conn, ledger, entry_date, values, user_id)
+        if saved:
+            # This day's closing is the next day's opening: hold that day's
+            # ledger lock too (ascending order, so no deadlock) and refresh both.
+            next_day = entry_date + timedelta(days=1)
+            _lock_ledger_day(conn, ledger, next_day)
+            refresh_sales_for_dates(conn, [entry_date, next_day])
 
         if finalize:
             conn.execute(
@@ -263,25 +368,17 @@ def save_snacks_drinks_daily(
                 (entry_date, user_id),
             )
         conn.commit()
+    day_cache.bump(MODULE_SNACKS_DRINKS, [entry_date, entry_date + timedelta(days=1)])
     return {"saved": saved, "locked": is_snacks_drinks_day_locked(entry_date)}
 
 
-class DayLockedError(Exception):
-    """Raised when a clerk tries to edit a finalized day."""
-
-
-# Advisory-lock namespaces for day mutations (arbitrary stable ints).
-_FOOD_KUKU_LOCK_NS = 8742001
-_SNACKS_DRINKS_LOCK_NS = 8742002
-
-
-def is_food_kuku_day_locked(entry_date: date) -> bool:
-    with get_conn() as conn:
-        row = conn.execute(
+async def is_food_kuku_day_locked_async(entry_date: date) -> bool:
+    async with get_async_conn() as conn:
+        cur = await conn.execute(
             "SELECT 1 FROM food_kuku_day_lock WHERE entry_date = %s",
             (entry_date,),
-        ).fetchone()
-        return row is not None
+        )
+        return await cur.fetchone() is not None
 
 
 def is_snacks_drinks_day_locked(entry_date: date) -> bool:
@@ -300,6 +397,56 @@ def is_snacks_drinks_day_locked(entry_date: date) -> bool:
     return total_revenue > 0
 
 
+async def is_snacks_drinks_day_locked_async(
+    entry_date: date, rows: Optional[list[dict[str, Any]]] = None
+) -> bool:
+    """Async is_snacks_drinks_day_locked; pass the day's rows when already loaded."""
+    async with get_async_conn() as conn:
+        cur = await conn.execute(
+            "SELECT 1 FROM snacks_drinks_day_lock WHERE entry_date = %s",
+            (entry_date,),
+        )
+        if await cur.fetchone() is not None:
+            return True
+    if rows is None:
+        rows = await get_snacks_drinks_daily_async(entry_date)
+    total_revenue = sum(
+        float(r["revenue"]) for r in rows if r.get("revenue") is not None
+    )
+    return total_revenue > 0
+
+
+async def locked_days_async(days: list[date]) -> dict[date, dict[str, bool]]:
+    """Per day: whether food/kuku and snacks/drinks are finalized (for day_cache)."""
+    async with get_async_conn() as conn:
+        cur = await conn.execute(
+            """
+            SELECT d::date AS day,
+                   EXISTS (
+                     SELECT 1 FROM food_kuku_day_lock f WHERE f.entry_date = d
+                   ) AS food_kuku,
+                   EXISTS (
+                     SELECT 1 FROM snacks_drinks_day_lock s WHERE s.entry_date = d
+                   ) OR EXISTS (
+                     SELECT 1 FROM daily_item_sales r
+                     WHERE r.entry_date = d
+                       AND r.category IN ('snacks', 'drinks')
+                       AND r.revenue > 0
+                   ) AS snacks_drinks
+            FROM unnest(%s::date[]) AS d
+            """,
+            (days,),
+        )
+        rows = await cur.fetchall()
+    return {
+        row["day"]: {
+            MODULE_FOOD_KUKU: row["food_kuku"],
+            MODULE_SNACKS_DRINKS: row["snacks_drinks"],
+        }
+        for row in rows
+    }
+
+
 def lock_food_kuku_day(entry_date: date, user_id: int) -> None:
     with get_conn() as conn:
         conn.execute(
@@ -311,6 +458,7 @@ def lock_food_kuku_day(entry_date: date, user_id: int) -> None:
             (entry_date, user_id),
         )
         conn.commit()
+    day_cache.bump(MODULE_FOOD_KUKU, [entry_date])
 
 
 def lock_snacks_drinks_day(entry_date: date, user_id: int) -> None:
@@ -324,42 +472,38 @@ def lock_snacks_drinks_day(entry_date: date, user_id: int) -> None:
             (entry_date, user_id),
         )
         conn.commit()
+    day_cache.bump(MODULE_SNACKS_DRINKS, [entry_date])
+
+
+_FOOD_KUKU_DAILY_SQL = f"""
+    SELECT i.id AS item_id, i.name,
+           COALESCE(d.quantity, 0) AS quantity,
+           COALESCE(pi.price_ksh, 0) AS price_ksh,
+           d.id AS record_id
+    FROM items i
+    LEFT JOIN food_kuku_daily d
+      ON d.item_id = i.id AND d.entry_date = %(entry_date)s
+    {price_as_of_join("pi", "i.id", "%(entry_date)s::date")}
+    WHERE i.group_type = 'food_kuku' AND i.is_active = TRUE
+    ORDER BY i.name
+    """
 
 
-def get_food_kuku_daily(entry_date: date) -> list[dict[str, Any]]:
-    with get_conn() as conn:
-        rows = conn.execute(
-            """
-            SELECT i.id AS item_id, i.name,
-                   COALESCE(d.quantity, 0) AS quantity,
-                   COALESCE(
-                     (SELECT ip.price_ksh FROM item_prices ip
-                      WHERE ip.item_id = i.id
-                        AND ip.effective_from <= %s
-                      ORDER BY ip.effective_from DESC, ip.id DESC
-                      LIMIT 1),
-                     (SELECT ip.price_ksh FROM item_prices ip
-                      WHERE ip.item_id = i.id
-                      ORDER BY ip.effective_from ASC, ip.id ASC
-                      LIMIT 1),
-                     0
-                   ) AS price_ksh,
-                   d.id AS record_id
-            FROM items i
-            LEFT JOIN food_kuku_daily d
-              ON d.item_id = i.id AND d.entry_date = %s
-            WHERE i.group_type = 'food_kuku' AND i.is_active = TRUE
-            ORDER BY i.name
-            """,
-            (entry_date, entry_date),
-        ).fetchall()
-        out = []
-        for r in rows:
-            row = dict(r)
-            row["quantity"] = float(row.get("quantity") or 0)
-            row["price_ksh"] = float(row.get("price_ksh") or 0)
-            out.append(row)
-        return out
+def _food_kuku_daily_rows(rows) -> list[dict[str, Any]]:
+    out = []
+    for r in rows:
+        row = dict(r)
+        row["quantity"] = float(row.get("quantity") or 0)
+        row["price_ksh"] = float(row.get("price_ksh") or 0)
+        out.append(row)
+    return out
+
+
+async def get_food_kuku_daily_async(entry_date: date) -> list[dict[str, Any]]:
+    async with get_async_conn() as conn:
+        cur = await conn.execute(_FOOD_KUKU_DAILY_SQL, {"entry_date": entry_date})
+        rows = await cur.fetchall()
+    return _food_kuku_daily_rows(rows)
 
 
 def save_food_kuku_daily(
@@ -370,16 +514,11 @@ def save_food_kuku_daily(
     finalize: bool = False,
     block_if_locked: bool = False,
 ) -> dict[str, Any]:
-    saved = 0
-    total_revenue = 0.0
-    with get_conn() as conn:
+    ledger = FOOD_KUKU_LEDGER
+    with get_conn(pipeline=True) as conn:
         # Serialize all mutations for this day so lock check + write + finalize
         # cannot race across concurrent requests.
-        day_key = int(entry_date.strftime("%Y%m%d"))
-        conn.execute(
-            "SELECT pg_advisory_xact_lock(%s, %s)",
-            (_FOOD_KUKU_LOCK_NS, day_key),
-        )
+        _lock_ledger_day(conn, ledger, entry_date)
         locked_row = conn.execute(
             "SELECT 1 FROM food_kuku_day_lock WHERE entry_date = %s",
             (entry_date,),
@@ -388,106 +527,19 @@ def save_food_kuku_daily(
             raise DayLockedError("This day is finalized and cannot be edited.")
 
         _assert_items_in_group(
-            conn, [int(e["item_id"]) for e in entries], "food_kuku"
+            conn, [int(e["item_id"]) for e in entries], ledger.item_group
         )
 
-        for entry in entries:
-            item_id = int(entry["item_id"])
-            quantity = float(entry.get("quantity") or 0)
-            existing = conn.execute(
-                """
-                SELECT id, quantity FROM food_kuku_daily
-                WHERE entry_date = %s AND item_id = %s
-                """,
-                (entry_date, item_id),
-            ).fetchone()
-
-            if quantity <= 0:
-                if not existing:
-                    continue
-                record_id = existing["id"]
-                log_audit(
-                    conn,
-                    table_name="food_kuku_daily",
-                    record_id=record_id,
-                    item_id=item_id,
-                    entry_date=entry_date,
-                    field_name="quantity",
-                    old_value=existing["quantity"],
-                    new_value=0,
-                    changed_by=user_id,
-                )
-                conn.execute(
-                    "DELETE FROM food_kuku_daily WHERE id = %s",
-                    (record_id,),
-                )
-                saved += 1
-                continue
-
-            price_row = conn.execute(
-                """
-                SELECT COALESCE(
-                     (SELECT ip.price_ksh FROM item_prices ip
-                      WHERE ip.item_id = %s
-                        AND ip.effective_from <= %s
-                      ORDER BY ip.effective_from DESC, ip.id DESC
-                      LIMIT 1),
-                     (SELECT ip.price_ksh FROM item_prices ip
-                      WHERE ip.item_id = %s
-                      ORDER BY ip.effective_from ASC, ip.id ASC
-                      LIMIT 1),
-                     0
-                   ) AS price_ksh
-                """,
-                (item_id, entry_date, item_id),
-            ).fetchone()
-            price = float(price_row["price_ksh"])
-            total_revenue += quantity * price
-
-            if existing:
-                record_id = existing["id"]
-                if float(existing["quantity"]) != quantity:
-                    log_audit(
-                        conn,
-                        table_name="food_kuku_daily",
-                        record_id=record_id,
-                        item_id=item_id,
-                        entry_date=entry_date,
-                        field_name="quantity",
-                        old_value=existing["quantity"],
-                        new_value=quantity,
-                        changed_by=user_id,
-                    )
-                conn.execute(
-                    """
-                    UPDATE food_kuku_daily
-                    SET quantity = %s, submitted_by = %s, submitted_at = NOW()
-                    WHERE id = %s
-                    """,
-                    (quantity, user_id, record_id),
-                )
-            else:
-                row = conn.execute(
-                    """
-                    INSERT INTO food_kuku_daily
-                      (entry_date, item_id, quantity, submitted_by)
-                    VALUES (%s, %s, %s, %s)
-                    RETURNING id
-                    """,
-                    (entry_date, item_id, quantity, user_id),
-                ).fetchone()
-                log_audit(
-                    conn,
-                    table_name="food_kuku_daily",
-                    record_id=row["id"],
-                    item_id=item_id,
-                    entry_date=entry_date,
-                    field_name="quantity",
-                    old_value=None,
-                    new_value=quantity,
-                    changed_by=user_id,
-                )
-            saved += 1
+        values = {
+            int(e["item_id"]): {"quantity": float(e.get("quantity") or 0)}
+            for e in entries
+        }
+        sold = {i: v["quantity"] for i, v in values.items() if v["quantity"] > 0}
+        prices = price_timeline.prices_on(sold, entry_date, conn)
+        total_revenue = sum(q * prices[i] for i, q in sold.items())
+        saved = write_daily_ledger(conn, ledger, entry_date, values, user_id)
+        if saved:
+            refresh_sales_for_dates(conn, [entry_date])
         locked = locked_row is not None
         if finalize:
             conn.execute(
@@ -500,6 +552,7 @@ def save_food_kuku_daily(
             )
             locked = True
         conn.commit()
+    day_cache.bump(MODULE_FOOD_KUKU, [entry_date])
     return {"saved": saved, "total_revenue": total_revenue, "locked": locked}
 
 
@@ -525,82 +578,20 @@ def get_stock_items_daily(entry_date: date) -> list[dict[str, Any]]:
 def save_stock_items_daily(
     entry_date: date, entries: list[dict[str, Any]], user_id: int
 ) -> int:
-    saved = 0
-    with get_conn() as conn:
+    ledger = STOCK_ITEMS_LEDGER
+    with get_conn(pipeline=True) as conn:
+        _lock_ledger_day(conn, ledger, entry_date)
         _assert_items_in_group(
-            conn, [int(e["item_id"]) for e in entries], "stock"
+            conn, [int(e["item_id"]) for e in entries], ledger.item_group
         )
-        for entry in entries:
-            item_id = int(entry["item_id"])
-            closing = float(entry.get("closing_stock") or 0)
-            added = float(entry.get("added_stock") or 0)
-            existing = conn.execute(
-                """
-                SELECT id, closing_stock, added_stock
-                FROM stock_items_daily
-                WHERE entry_date = %s AND item_id = %s
-                """,
-                (entry_date, item_id),
-            ).fetchone()
-            if existing:
-                record_id = existing["id"]
-                if float(existing["closing_stock"]) != closing:
-                    log_audit(
-                        conn,
-                        table_name="stock_items_daily",
-                        record_id=record_id,
-                        item_id=item_id,
-                        entry_date=entry_date,
-                        field_name="closing_stock",
-                        old_value=existing["closing_stock"],
-                        new_value=closing,
-                        changed_by=user_id,
-                    )
-                if float(existing["added_stock"]) != added:
-                    log_audit(
-                        conn,
-                        table_name="stock_items_daily",
-                        record_id=record_id,
-                        item_id=item_id,
-                        entry_date=entry_date,
-                        field_name="added_stock",
-                        old_value=existing["added_stock"],
-                        new_value=added,
-                        changed_by=user_id,
-                    )
-                conn.execute(
-                    """
-                    UPDATE stock_items_daily
-                    SET closing_stock = %s, added_stock = %s,
-                        submitted_by = %s, submitted_at = NOW()
-                    WHERE id = %s
-                    """,
-                    (closing, added, user_id, record_id),
-                )
-            else:
-                row = conn.execute(
-                    """
-                    INSERT INTO stock_items_daily
-                      (entry_date, item_id, closing_stock, added_stock, submitted_by)
-                    VALUES (%s, %s, %s, %s, %s)
-                    RETURNING id
-                    """,
-                    (entry_date, item_id, closing, added, user_id),
-                ).fetchone()
-                record_id = row["id"]
-                for field, val in [("closing_stock", closing), ("added_stock", added)]:
-                    log_audit(
-                        conn,
-                        table_name="stock_items_daily",
-                        record_id=record_id,
-                        item_id=item_id,
-                        entry_date=entry_date,
-                        field_name=field,
-                        old_value=None,
-                        new_value=val,
-                        changed_by=user_id,
-                    )
-            saved += 1
+        values = {
+            int(e["item_id"]): {
+                "closing_stock": float(e.get("closing_stock") or 0),
+                "added_stock": float(e.get("added_stock") or 0),
+            }
+            for e in entries
+        }
+        saved = write_daily_ledger(conn, ledger, entry_date, values, user_id)
         conn.commit()
     return saved
 
@@ -633,155 +624,89 @@ def _compute_bar_metrics(record: dict[str, Any]) -> dict[str, Any]:
     return record
 
 
-def get_bar_daily(entry_date: date) -> list[dict[str, Any]]:
-    with get_conn() as conn:
-        rows = conn.execute(
-            """
-            SELECT i.id AS item_id, i.name, i.display_order,
-                   COALESCE(prev.closing_stock, 0) AS opening_stock,
-                   prev.opening_from_date,
-                   cur.added_stock,
-                   cur.closing_stock,
-                   COALESCE(
-                     (SELECT ip.price_ksh FROM item_prices ip
-                      WHERE ip.item_id = i.id
-                        AND ip.effective_from <= %s
-                      ORDER BY ip.effective_from DESC, ip.id DESC
-                      LIMIT 1),
-                     (SELECT ip.price_ksh FROM item_prices ip
-                      WHERE ip.item_id = i.id
-                      ORDER BY ip.effective_from ASC, ip.id ASC
-                      LIMIT 1),
-                     0
-                   ) AS price_ksh,
-                   cur.id AS record_id
-            FROM items i
-            LEFT JOIN bar_daily cur
-              ON cur.item_id = i.id AND cur.entry_date = %s
-            LEFT JOIN LATERAL (
-              SELECT p.closing_stock, p.entry_date AS opening_from_date
-              FROM bar_daily p
-              WHERE p.item_id = i.id
-                AND p.entry_date < %s
-              ORDER BY p.entry_date DESC
-              LIMIT 1
-            ) prev ON true
-            WHERE i.group_type = 'bar' AND i.is_active = TRUE
-            ORDER BY i.display_order, i.name
-            """,
-            (entry_date, entry_date, entry_date),
-        ).fetchall()
-        return [_compute_bar_metrics(dict(row)) for row in rows]
+_BAR_DAILY_SQL = f"""
+    SELECT i.id AS item_id, i.name, i.display_order,
+           COALESCE(prev.closing_stock, 0) AS opening_stock,
+           prev.opening_from_date,
+           cur.added_stock,
+           cur.closing_stock,
+           COALESCE(pi.price_ksh, 0) AS price_ksh,
+           cur.id AS record_id
+    FROM items i
+    LEFT JOIN bar_daily cur
+      ON cur.item_id = i.id AND cur.entry_date = %(entry_date)s
+    LEFT JOIN LATERAL (
+      SELECT p.closing_stock, p.entry_date AS opening_from_date
+      FROM bar_daily p
+      WHERE p.item_id = i.id
+        AND p.entry_date < %(entry_date)s
+      ORDER BY p.entry_date DESC
+      LIMIT 1
+    ) prev ON true
+    {price_as_of_join("pi", "i.id", "%(entry_date)s::date")}
+    WHERE i.group_type = 'bar' AND i.is_active = TRUE
+    ORDER BY i.display_order, i.name
+    """
+
+
+async def get_bar_daily_async(entry_date: date) -> list[dict[str, Any]]:
+    async with get_async_conn() as conn:
+        cur = await conn.execute(_BAR_DAILY_SQL, {"entry_date": entry_date})
+        rows = await cur.fetchall()
+    return [_compute_bar_metrics(dict(row)) for row in rows]
 
 
 def _validate_bar_closing_not_over_total(
     conn, entry_date: date, entries: list[dict[str, Any]]
 ) -> None:
-    violations: list[str] = []
-    for entry in entries:
-        if entry.get("closing_stock") is None:
-            continue
-        item_id = int(entry["item_id"])
-        closing = float(entry["closing_stock"])
-        added = float(entry.get("added_stock") or 0)
-        prev_row = conn.execute(
-            """
-            SELECT closing_stock FROM bar_daily
-            WHERE item_id = %s AND entry_date < %s
-            ORDER BY entry_date DESC
-            LIMIT 1
-            """,
-            (item_id, entry_date),
-        ).fetchone()
-        opening = float(prev_row["closing_stock"]) if prev_row else 0.0
-        total = opening + added
-        if closing > total:
-            name_row = conn.execute(
-                "SELECT name FROM items WHERE id = %s", (item_id,)
-            ).fetchone()
-            violations.append(name_row["name"] if name_row else str(item_id))
-    if violations:
-        raise ValueError(f"closing_exceeds_total:{','.join(violations)}")
+    checked = [e for e in entries if e.get("closing_stock") is not None]
+    if not checked:
+        return
+    # Opening is the latest prior closing, resolved for every item at once.
+    rows = conn.execute(
+        """
+        SELECT COALESCE(i.name, e.item_id::text) AS name
+        FROM unnest(%s::int[], %s::numeric[], %s::numeric[])
+          WITH ORDINALITY AS e(item_id, closing_stock, added_stock, ord)
+        LEFT JOIN items i ON i.id = e.item_id
+        LEFT JOIN LATERAL (
+          SELECT p.closing_stock
+          FROM bar_daily p
+          WHERE p.item_id = e.item_id
+            AND p.entry_date < %s
+          ORDER BY p.entry_date DESC
+          LIMIT 1
+        ) prev ON true
+        WHERE e.closing_stock > COALESCE(prev.closing_stock, 0) + e.added_stock
+        ORDER BY e.ord
+        """,
+        (
+            [int(e["item_id"]) for e in checked],
+            [float(e["closing_stock"]) for e in checked],
+            [float(e.get("added_stock") or 0) for e in checked],
+            entry_date,
+        ),
+    ).fetchall()
+    if rows:
+        raise ValueError(f"closing_exceeds_total:{','.join(r['name'] for r in rows)}")
 
 
 def save_bar_daily(entry_date: date, entries: list[dict[str, Any]], user_id: int) -> int:
-    saved = 0
-    with get_conn() as conn:
+    ledger = BAR_LEDGER
+    with get_conn(pipeline=True) as conn:
+        _lock_ledger_day(conn, ledger, entry_date)
         _assert_items_in_group(
-            conn, [int(e["item_id"]) for e in entries], "bar"
+            conn, [int(e["item_id"]) for e in entries], ledger.item_group
         )
         _validate_bar_closing_not_over_total(conn, entry_date, entries)
-        for entry in entries:
-            item_id = int(entry["item_id"])
-            added = float(entry.get("added_stock") or 0)
-            closing = float(entry.get("closing_stock") or 0)
-            existing = conn.execute(
-                """
-                SELECT id, added_stock, closing_stock
-                FROM bar_daily
-                WHERE entry_date = %s AND item_id = %s
-                """,
-                (entry_date, item_id),
-            ).fetchone()
-            if existing:
-                record_id = existing["id"]
-                if float(existing["added_stock"]) != added:
-                    log_audit(
-                        conn,
-                        table_name="bar_daily",
-                        record_id=record_id,
-                        item_id=item_id,
-                        entry_date=entry_date,
-                        field_name="added_stock",
-                        old_value=existing["added_stock"],
-                        new_value=added,
-                        changed_by=user_id,
-                    )
-                if float(existing["closing_stock"]) != closing:
-                    log_audit(
-                        conn,
-                        table_name="bar_daily",
-                        record_id=record_id,
-                        item_id=item_id,
-                        entry_date=entry_date,
-                        field_name="closing_stock",
-                        old_value=existing["closing_stock"],
-                        new_value=closing,
-                        changed_by=user_id,
-                    )
-                conn.execute(
-                    """
-                    UPDATE bar_daily
-                    SET added_stock = %s, closing_stock = %s,
-                        submitted_by = %s, submitted_at = NOW()
-                    WHERE id = %s
-                    """,
-                    (added, closing, user_id, record_id),
-                )
-            else:
-                row = conn.execute(
-                    """
-                    INSERT INTO bar_daily
-                      (entry_date, item_id, added_stock, closing_stock, submitted_by)
-                    VALUES (%s, %s, %s, %s, %s)
-                    RETURNING id
-                    """,
-                    (entry_date, item_id, added, closing, user_id),
-                ).fetchone()
-                record_id = row["id"]
-                for field, val in [("added_stock", added), ("closing_stock", closing)]:
-                    log_audit(
-                        conn,
-                        table_name="bar_daily",
-                        record_id=record_id,
-                        item_id=item_id,
-                        entry_date=entry_date,
-                        field_name=field,
-                        old_value=None,
-                        new_value=val,
-                        changed_by=user_id,
-                    )
-            saved += 1
+        values = {
+            int(e["item_id"]): {
+                "added_stock": float(e.get("added_stock") or 0),
+                "closing_stock": float(e.get("closing_stock") or 0),
+            }
+            for e in entries
+        }
+        saved = write_daily_ledger(conn, ledger, entry_date, values, user_id)
         conn.commit()
     return saved
 
@@ -798,10 +723,16 @@ def get_audit_timeline(
     group: str,
     date_from: Optional[date],
     date_to: Optional[date],
-) -> list[dict[str, Any]]:
+    before: Optional[tuple[datetime, int]] = None,
+    limit: int = 500,
+) -> tuple[list[dict[str, Any]], Optional[tuple[datetime, int]]]:
+    """Newest-first changelog page; returns (rows, keyset of the next page).
+
+    Pages on (changed_at, id) so older history stays reachable without OFFSET.
+    """
     table_name = TABLE_BY_GROUP.get(group)
     if not table_name:
-        return []
+        return [], None
     query = """
         SELECT a.id, a.table_name, a.record_id, a.item_id, i.name AS item_name,
                a.entry_date, a.field_name, a.old_value, a.new_value,
@@ -819,10 +750,225 @@ def get_audit_timeline(
     if date_to:
         query += " AND a.entry_date <= %s"
         params.append(date_to)
-    query += " ORDER BY a.changed_at DESC LIMIT 500"
+    if before:
+        query += " AND (a.changed_at, a.id) < (%s, %s)"
+        params.extend(before)
+    # One extra row tells whether another page exists.
+    query += " ORDER BY a.changed_at DESC, a.id DESC LIMIT %s"
+    params.append(limit + 1)
     with get_conn() as conn:
         rows = conn.execute(query, params).fetchall()
-        return [dict(r) for r in rows]
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, (rows[-1]["changed_at"], rows[-1]["id"])
+
+
+def _stock_audit_sql(daily_table: str) -> str:
+    # Dense item x day grid over [date_from - 1, date_to + 1] joined once to
+    # the daily table; on a dense grid LAG/LEAD are exactly the previous and
+    # next calendar day, so no per-offset self-joins are needed.
+    return f"""
+        WITH dates AS (
+          SELECT generate_series(
+            %(date_from)s::date - 1, %(date_to)s::date + 1, '1 day'::interval
+          )::date AS entry_date
+        ),
+        items_list AS (
+          SELECT id, name, subcategory FROM items
+          WHERE group_type = %(item_group)s AND is_active = TRUE
+        ),
+        daily AS (
+          SELECT id, item_id, entry_date, closing_stock, added_stock
+          FROM {daily_table}
+          WHERE entry_date BETWEEN %(date_from)s::date - 1
+                               AND %(date_to)s::date + 1
+        ),
+        timeline AS (
+          SELECT il.id AS item_id, il.name AS item_name, il.subcategory,
+                 g.entry_date,
+                 d.id AS daily_record_id,
+                 d.closing_stock,
+                 d.added_stock,
+                 LAG(d.closing_stock) OVER w AS prev_closing,
+                 LEAD(d.closing_stock) OVER w AS next_closing
+          FROM items_list il
+          CROSS JOIN dates g
+          LEFT JOIN daily d
+            ON d.item_id = il.id AND d.entry_date = g.entry_date
+          WINDOW w AS (PARTITION BY il.id ORDER BY g.entry_date)
+        )
+        SELECT t.item_id, t.item_name, t.entry_date, t.subcategory,
+               t.daily_record_id,
+               t.closing_stock,
+               t.added_stock,
+               COALESCE(t.prev_closing, 0) AS opening_stock,
+               t.next_closing AS next_closing_units,
+               COALESCE(pi.price_ksh, 0) AS price_ksh
+        FROM timeline t
+        {price_as_of_join("pi", "t.item_id", "t.entry_date")}
+        WHERE t.entry_date BETWEEN %(date_from)s AND %(date_to)s
+        ORDER BY t.item_name, t.entry_date
+    """
+
+
+_FOOD_KUKU_AUDIT_SQL = f"""
+    WITH dates AS (
+      SELECT generate_series(
+        %(date_from)s::date, %(date_to)s::date, '1 day'::interval
+      )::date AS entry_date
+    ),
+    items_list AS (
+      SELECT id, name FROM items
+      WHERE group_type = 'food_kuku' AND is_active = TRUE
+    )
+    SELECT il.id AS item_id, il.name AS item_name, d.entry_date,
+           CASE WHEN f.id IS NULL THEN NULL ELSE COALESCE(f.quantity, 0) END AS quantity,
+           COALESCE(pi.price_ksh, 0) AS price_ksh,
+           CASE
+             WHEN f.id IS NULL THEN NULL
+             ELSE COALESCE(f.quantity, 0) * COALESCE(pi.price_ksh, 0)
+           END AS revenue
+    FROM items_list il
+    CROSS JOIN dates d
+    LEFT JOIN food_kuku_daily f
+      ON f.item_id = il.id AND f.entry_date = d.entry_date
+    {price_as_of_join("pi", "il.id", "d.entry_date")}
+    ORDER BY il.name, d.entry_date
+"""
+
+# Bar days may be skipped, so opening stock is the latest closing before the
+# day. It is filled forward with windows over one scan of the range: grp counts
+# entries seen so far, FIRST_VALUE per (item, grp) carries the last entry
+# forward, and `seed` covers the days before an item's first entry.
+_BAR_AUDIT_SQL = f"""
+    WITH dates AS (
+      SELECT generate_series(
+        %(date_from)s::date, %(date_to)s::date, '1 day'::interval
+      )::date AS entry_date
+    ),
+    items_list AS (
+      SELECT id, name, display_order FROM items
+      WHERE group_type = 'bar' AND is_active = TRUE
+    ),
+    daily AS (
+      SELECT item_id, entry_date, added_stock, closing_stock
+      FROM bar_daily
+      WHERE entry_date BETWEEN %(date_from)s AND %(date_to)s
+    ),
+    grid AS (
+      SELECT il.id AS item_id, il.name AS item_name, il.display_order,
+             g.entry_date,
+             cur.entry_date AS row_date,
+             cur.added_stock,
+             cur.closing_stock,
+             COUNT(cur.entry_date) OVER (
+               PARTITION BY il.id ORDER BY g.entry_date
+             ) AS grp
+      FROM items_list il
+      CROSS JOIN dates g
+      LEFT JOIN daily cur
+        ON cur.item_id = il.id AND cur.entry_date = g.entry_date
+    ),
+    carried AS (
+      SELECT gr.*,
+             FIRST_VALUE(gr.closing_stock) OVER grp_w AS carry_closing,
+             FIRST_VALUE(gr.row_date) OVER grp_w AS carry_date
+      FROM grid gr
+      WINDOW grp_w AS (PARTITION BY gr.item_id, gr.grp ORDER BY gr.entry_date)
+    ),
+    seed AS (
+      SELECT il.id AS item_id, p.closing_stock, p.entry_date
+      FROM items_list il
+      CROSS JOIN LATERAL (
+        SELECT closing_stock, entry_date
+        FROM bar_daily
+        WHERE item_id = il.id AND entry_date < %(date_from)s
+        ORDER BY entry_date DESC
+        LIMIT 1
+      ) p
+    )
+    SELECT c.item_id, c.item_name, c.entry_date,
+           COALESCE(LAG(c.carry_closing) OVER w, seed.closing_stock, 0) AS opening_stock,
+           COALESCE(LAG(c.carry_date) OVER w, seed.entry_date) AS opening_from_date,
+           c.added_stock,
+           c.closing_stock,
+           COALESCE(pi.price_ksh, 0) AS price_ksh
+    FROM carried c
+    LEFT JOIN seed ON seed.item_id = c.item_id
+    {price_as_of_join("pi", "c.item_id", "c.entry_date")}
+    WINDOW w AS (PARTITION BY c.item_id ORDER BY c.entry_date)
+    ORDER BY c.display_order, c.item_name, c.entry_date
+"""
+
+
+def _snacks_audit_row(row: dict[str, Any]) -> dict[str, Any]:
+    # dict_row rows are plain dicts: adjust them in place, no copies.
+    if row.pop("daily_record_id", None) is None:
+        row["closing_stock"] = None
+        row["added_stock"] = None
+        row["total_units"] = None
+        row["sold_units"] = None
+        row["revenue"] = None
+    else:
+        added = float(row["added_stock"] or 0)
+        closing = float(row["closing_stock"] or 0)
+        total_units = float(row["opening_stock"]) + added
+        sold_units = max(total_units - closing, 0.0)
+        row["added_stock"] = added
+        row["closing_stock"] = closing
+        row["total_units"] = total_units
+        row["sold_units"] = sold_units
+        row["revenue"] = sold_units * float(row["price_ksh"])
+    return row
+
+
+def _stock_audit_row(row: dict[str, Any]) -> dict[str, Any]:
+    if row.pop("daily_record_id", None) is None:
+        row["closing_stock"] = None
+        row["added_stock"] = None
+    else:
+        row["added_stock"] = float(row["added_stock"] or 0)
+        row["closing_stock"] = float(row["closing_stock"] or 0)
+    return row
+
+
+_STOCK_AUDIT_COLUMNS = (
+    "item_id", "item_name", "entry_date", "subcategory", "closing_stock",
+    "added_stock", "opening_stock", "next_closing_units", "price_ksh",
+)
+
+# Keys of an audit row per group, in row order (CSV headers for empty ranges).
+AUDIT_COLUMNS = {
+    "snacks_drinks": _STOCK_AUDIT_COLUMNS + ("total_units", "sold_units", "revenue"),
+    "stock": _STOCK_AUDIT_COLUMNS,
+    "food_kuku": (
+        "item_id", "item_name", "entry_date", "quantity", "price_ksh", "revenue",
+    ),
+    "bar": (
+        "item_id", "item_name", "entry_date", "opening_stock", "opening_from_date",
+        "added_stock", "closing_stock", "price_ksh", "total_units", "over_closing",
+        "sold_units", "revenue",
+    ),
+}
+
+
+def _inventory_audit_query(
+    group: str, date_from: date, date_to: date
+) -> Optional[tuple[str, dict[str, Any], Callable[[dict[str, Any]], dict[str, Any]]]]:
+    """(sql, params, per-row post-processing) for a group's audit, or None."""
+    params: dict[str, Any] = {"date_from": date_from, "date_to": date_to}
+    if group == "snacks_drinks":
+        params["item_group"] = "snacks_drinks"
+        return _stock_audit_sql("snacks_drinks_daily"), params, _snacks_audit_row
+    if group == "stock":
+        params["item_group"] = "stock"
+        return _stock_audit_sql("stock_items_daily"), params, _stock_audit_row
+    if group == "food_kuku":
+        return _FOOD_KUKU_AUDIT_SQL, params, lambda row: row
+    if group == "bar":
+        return _BAR_AUDIT_SQL, params, _compute_bar_metrics
+    return None
 
 
 def get_inventory_audit(
@@ -831,187 +977,34 @@ def get_inventory_audit(
     date_to: date,
 ) -> list[dict[str, Any]]:
     """Per-item timeline with opening (prev closing), added, closing."""
-    if group == "snacks_drinks":
-        daily_table = "snacks_drinks_daily"
-        item_group = "snacks_drinks"
-    elif group == "food_kuku":
-        return _food_kuku_audit(date_from, date_to)
-    elif group == "stock":
-        daily_table = "stock_items_daily"
-        item_group = "stock"
-    elif group == "bar":
-        return _bar_audit(date_from, date_to)
-    else:
+    audit = _inventory_audit_query(group, date_from, date_to)
+    if audit is None:
         return []
-
+    query, params, finish_row = audit
     with get_conn() as conn:
-        rows = conn.execute(
-            f"""
-            WITH dates AS (
-              SELECT generate_series(%s::date, %s::date, '1 day'::interval)::date AS entry_date
-            ),
-            items_list AS (
-              SELECT id, name, subcategory FROM items
-              WHERE group_type = %s AND is_active = TRUE
-            )
-            SELECT il.id AS item_id, il.name AS item_name, d.entry_date,
-                   il.subcategory,
-                   cur.id AS daily_record_id,
-                   cur.closing_stock AS closing_stock,
-                   cur.added_stock AS added_stock,
-                   COALESCE(prev.closing_stock, 0) AS opening_stock,
-                   nxt.closing_stock AS next_closing_units,
-                   COALESCE(
-                     (SELECT ip.price_ksh FROM item_prices ip
-                      WHERE ip.item_id = il.id
-                        AND ip.effective_from <= d.entry_date
-                      ORDER BY ip.effective_from DESC, ip.id DESC
-                      LIMIT 1),
-                     (SELECT ip.price_ksh FROM item_prices ip
-                      WHERE ip.item_id = il.id
-                      ORDER BY ip.effective_from ASC, ip.id ASC
-                      LIMIT 1),
-                     0
-                   ) AS price_ksh
-            FROM items_list il
-            CROSS JOIN dates d
-            LEFT JOIN {daily_table} cur
-              ON cur.item_id = il.id AND cur.entry_date = d.entry_date
-            LEFT JOIN {daily_table} prev
-              ON prev.item_id = il.id
-             AND prev.entry_date = (d.entry_date - INTERVAL '1 day')::date
-            LEFT JOIN {daily_table} nxt
-              ON nxt.item_id = il.id
-             AND nxt.entry_date = (d.entry_date + INTERVAL '1 day')::date
-            ORDER BY il.name, d.entry_date
-            """,
-            (date_from, date_to, item_group),
-        ).fetchall()
-        result = [dict(r) for r in rows]
-        if group == "snacks_drinks":
-            for row in result:
-                if row.get("daily_record_id") is None:
-                    row["closing_stock"] = None
-                    row["added_stock"] = None
-                    row["total_units"] = None
-                    row["sold_units"] = None
-                    row["revenue"] = None
-                else:
-                    added = float(row["added_stock"] or 0)
-                    closing = float(row["closing_stock"] or 0)
-                    total_units = float(row["opening_stock"]) + added
-                    sold_units = max(total_units - closing, 0.0)
-                    row["added_stock"] = added
-                    row["closing_stock"] = closing
-                    row["total_units"] = total_units
-                    row["sold_units"] = sold_units
-                    row["revenue"] = sold_units * float(row["price_ksh"])
-        else:
-            for row in result:
-                if row.get("daily_record_id") is None:
-                    row["closing_stock"] = None
-                    row["added_stock"] = None
-                else:
-                    row["added_stock"] = float(row["added_stock"] or 0)
-                    row["closing_stock"] = float(row["closing_stock"] or 0)
-        for row in result:
-            row.pop("daily_record_id", None)
-        return result
-
-
-def _food_kuku_audit(date_from: date, date_to: date) -> list[dict[str, Any]]:
-    with get_conn() as conn:
-        rows = conn.execute(
-            """
-            WITH dates AS (
-              SELECT generate_series(%s::date, %s::date, '1 day'::interval)::date AS entry_date
-            ),
-            items_list AS (
-              SELECT id, name FROM items
-              WHERE group_type = 'food_kuku' AND is_active = TRUE
-            )
-            SELECT il.id AS item_id, il.name AS item_name, d.entry_date,
-                   CASE WHEN f.id IS NULL THEN NULL ELSE COALESCE(f.quantity, 0) END AS quantity,
-                   COALESCE(
-                     (SELECT ip.price_ksh FROM item_prices ip
-                      WHERE ip.item_id = il.id
-                        AND ip.effective_from <= d.entry_date
-                      ORDER BY ip.effective_from DESC, ip.id DESC
-                      LIMIT 1),
-                     (SELECT ip.price_ksh FROM item_prices ip
-                      WHERE ip.item_id = il.id
-                      ORDER BY ip.effective_from ASC, ip.id ASC
-                      LIMIT 1),
-                     0
-                   ) AS price_ksh,
-                   CASE
-                     WHEN f.id IS NULL THEN NULL
-                     ELSE COALESCE(f.quantity, 0) * COALESCE(
-                     (SELECT ip.price_ksh FROM item_prices ip
-                      WHERE ip.item_id = il.id
-                        AND ip.effective_from <= d.entry_date
-                      ORDER BY ip.effective_from DESC, ip.id DESC
-                      LIMIT 1),
-                     (SELECT ip.price_ksh FROM item_prices ip
-                      WHERE ip.item_id = il.id
-                      ORDER BY ip.effective_from ASC, ip.id ASC
-                      LIMIT 1),
-                     0
-                   )
-                   END AS revenue
-            FROM items_list il
-            CROSS JOIN dates d
-            LEFT JOIN food_kuku_daily f
-              ON f.item_id = il.id AND f.entry_date = d.entry_date
-            ORDER BY il.name, d.entry_date
-            """,
-            (date_from, date_to),
-        ).fetchall()
-        return [dict(r) for r in rows]
+        rows = conn.execute(query, params).fetchall()
+    return [finish_row(r) for r in rows]
 
 
-def _bar_audit(date_from: date, date_to: date) -> list[dict[str, Any]]:
-    with get_conn() as conn:
-        rows = conn.execute(
-            """
-            WITH dates AS (
-              SELECT generate_series(%s::date, %s::date, '1 day'::interval)::date AS entry_date
-            ),
-            items_list AS (
-              SELECT id, name, display_order FROM items
-              WHERE group_type = 'bar' AND is_active = TRUE
-            )
-            SELECT il.id AS item_id, il.name AS item_name, d.entry_date,
-                   COALESCE(prev.closing_stock, 0) AS opening_stock,
-                   prev.opening_from_date,
-                   cur.added_stock,
-                   cur.closing_stock,
-                   COALESCE(
-                     (SELECT ip.price_ksh FROM item_prices ip
-                      WHERE ip.item_id = il.id
-                        AND ip.effective_from <= d.entry_date
-                      ORDER BY ip.effective_from DESC, ip.id DESC
-                      LIMIT 1),
-                     (SELECT ip.price_ksh FROM item_prices ip
-                      WHERE ip.item_id = il.id
-                      ORDER BY ip.effective_from ASC, ip.id ASC
-                      LIMIT 1),
-                     0
-                   ) AS price_ksh
-            FROM items_list il
-            CROSS JOIN dates d
-            LEFT JOIN bar_daily cur
-              ON cur.item_id = il.id AND cur.entry_date = d.entry_date
-            LEFT JOIN LATERAL (
-              SELECT p.closing_stock, p.entry_date AS opening_from_date
-              FROM bar_daily p
-              WHERE p.item_id = il.id
-                AND p.entry_date < d.entry_date
-              ORDER BY p.entry_date DESC
-              LIMIT 1
-            ) prev ON true
-            ORDER BY il.display_order, il.name, d.entry_date
-            """,
-            (date_from, date_to),
-        ).fetchall()
-        return [_compute_bar_metrics(dict(r)) for r in rows]
+def iter_inventory_audit(
+    group: str,
+    date_from: date,
+    date_to: date,
+    batch_size: int = 2000,
+) -> Iterator[dict[str, Any]]:
+    """Same rows as get_inventory_audit, fetched batch_size at a time.
+
+    Uses a server-side cursor so long ranges are never fully held in memory.
+    The cursor lives on a dedicated, timeout-capped connection (get_stream_conn)
+    held until the iterator is exhausted or closed, not on the shared pool.
+    """
+    audit = _inventory_audit_query(group, date_from, date_to)
+    if audit is None:
+        return
+    query, params, finish_row = audit
+    with get_stream_conn() as conn:
+        with conn.cursor(name="inventory_audit") as cur:
+            cur.itersize = batch_size
+            cur.execute(query, params)
+            for row in cur:
+                yield finish_row(row)
@@ -0,0 +1,86 @@
+"""Cheap data-version fingerprints for HTTP validators (ETag).
+
+Each daily table contributes (row count, max submitted_at, max id) over the
+requested entry_date range, read through its entry_date index: inserts move
+max(id), updates move max(submitted_at) and deletes move the count. The item
+catalog and price history contribute one counter (catalog_version, migration
+014) bumped by every item and price write, so no whole-table scans.
+"""
+
+from datetime import date
+
+from db.async_connection import get_async_conn
+
+_DAY_RANGE = "entry_date BETWEEN %(date_from)s AND %(date_to)s"
+# Snacks openings come from the previous day's closing.
+_DAY_RANGE_WITH_PREV = (
+    "entry_date BETWEEN (%(date_from)s::date - 1) AND %(date_to)s"
+)
+
+
+def _range_fingerprint(table: str, where: str) -> str:
+    return (
+        f"(SELECT concat_ws(':', COUNT(*), MAX(submitted_at), MAX(id)) "
+        f"FROM {table} WHERE {where})"
+    )
+
+
+def _lock_fingerprint(table: str) -> str:
+    return (
+        f"(SELECT concat_ws(':', COUNT(*), MAX(locked_at)) "
+        f"FROM {table} WHERE {_DAY_RANGE})"
+    )
+
+
+_CATALOG = "(SELECT version::text FROM catalog_version)"
+
+# Bar openings carry forward from each item's latest earlier row: fingerprint
+# exactly those seed rows (one index probe per bar item).
+_BAR_SEED = """(SELECT concat_ws(':', COUNT(*), MAX(seed.submitted_at), MAX(seed.id))
+  FROM items i
+  CROSS JOIN LATERAL (
+    SELECT b.id, b.submitted_at
+    FROM bar_daily b
+    WHERE b.item_id = i.id AND b.entry_date < %(date_from)s
+    ORDER BY b.entry_date DESC
+    LIMIT 1
+  ) seed
+  WHERE i.group_type = 'bar' AND i.is_active = TRUE)"""
+
+_PARTS = {
+    "bar": [
+        _CATALOG,
+        _range_fingerprint("bar_daily", _DAY_RANGE),
+        _BAR_SEED,
+    ],
+    "snacks_drinks": [
+        _CATALOG,
+        _range_fingerprint("snacks_drinks_daily", _DAY_RANGE_WITH_PREV),
+        _lock_fingerprint("snacks_drinks_day_lock"),
+    ],
+    "food_kuku": [
+        _CATALOG,
+        _range_fingerprint("food_kuku_daily", _DAY_RANGE),
+        _lock_fingerprint("food_kuku_day_lock"),
+    ],
+    "sales": [
+        _CATALOG,
+        _range_fingerprint("snacks_drinks_daily", _DAY_RANGE_WITH_PREV),
+        _range_fingerprint("food_kuku_daily", _DAY_RANGE),
+    ],
+}
+
+_VERSION_SQL = {
+    kind: f"SELECT concat_ws('|', {', '.join(parts)}) AS version"
+    for kind, parts in _PARTS.items()
+}
+
+
+async def data_version_async(kind: str, date_from: date, date_to: date) -> str:
+    """Fingerprint of the data behind a `kind` response for the date range."""
+    async with get_async_conn() as conn:
+        cur = await conn.execute(
+            _VERSION_SQL[kind], {"date_from": date_from, "date_to": date_to}
+        )
+        row = await cur.fetchone()
+    return str(row["version"])
@@ -0,0 +1,78 @@
+"""In-process cache for results of finalized (locked) days.
+
+Clerks cannot change a locked day, so its GET payloads and report rows are
+stable until an admin edits it. Every write bumps a per-(module, day) version
+(or the global epoch for catalog/price edits); cached entries are stored with
+the version read *before* the DB query and only served while it still
+matches. A TTL bounds staleness from writes made by other worker processes.
+"""
+
+import os
+import time
+from collections import defaultdict
+from datetime import date
+from threading import Lock
+from typing import Any, Hashable, Iterable, Optional
+
+from core.metrics import cache_result
+
+
+def _int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+class DayCache:
+    def __init__(self, ttl_seconds: int = 600, max_entries: int = 2048) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._epoch = 0
+        self._versions: dict[tuple[str, date], int] = defaultdict(int)
+        self._entries: dict[Hashable, tuple[float, tuple, Any]] = {}
+        self._lock = Lock()
+
+    def version(self, day: date, modules: Iterable[str]) -> tuple:
+        with self._lock:
+            return (self._epoch, *(self._versions[(m, day)] for m in modules))
+
+    def bump(self, module: str, days: Iterable[date]) -> None:
+        """Record a write to module (a core.roles module key) on each of days."""
+        with self._lock:
+            for day in days:
+                self._versions[(module, day)] += 1
+
+    def bump_all(self) -> None:
+        """Record a write that may affect every day (prices, catalog)."""
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+
+    def get(self, key: Hashable, version: tuple) -> Optional[Any]:
+        if self.ttl_seconds <= 0:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[0] <= now or entry[1] != version):
+                del self._entries[key]
+                entry = None
+        cache_result("day", entry is not None)
+        return entry[2] if entry is not None else None
+
+    def put(self, key: Hashable, version: tuple, value: Any) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            if len(self._entries) >= self.max_entries:
+                # Dicts keep insertion order: drop the oldest entry.
+                del self._entries[next(iter(self._entries))]
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, version, value)
+
+
+day_cache = DayCache(
+    ttl_seconds=_int_env("DAY_CACHE_TTL_SEC", 600),
+    max_entries=_int_env("DAY_CACHE_MAX_ENTRIES", 2048),
+)
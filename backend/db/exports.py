@@ -0,0 +1,88 @@
+"""Streaming exports of the daily ledgers for admin reconciliation.
+
+Rows come from a server-side (named) cursor in fixed-size batches, so memory
+stays bounded by the batch size whatever the date range. The cursor runs on a
+dedicated, timeout-capped connection (get_stream_conn), not the shared pool.
+"""
+
+from datetime import date
+from typing import Any, Iterator
+
+from db.connection import get_stream_conn
+from db.daily import TABLE_BY_GROUP
+from db.price_sql import price_as_of_join
+
+# Quantity columns per ledger, in export order.
+LEDGER_COLUMNS = {
+    "snacks_drinks": ("added_stock", "closing_stock"),
+    "food_kuku": ("quantity",),
+    "stock": ("added_stock", "closing_stock"),
+    "bar": ("added_stock", "closing_stock"),
+}
+
+
+def export_columns(group: str) -> tuple[str, ...]:
+    """Column names of _export_sql(group), in order (the CSV header)."""
+    return (
+        "entry_date", "item_id", "item_name", *LEDGER_COLUMNS[group],
+        "price_ksh", "submitted_by", "submitted_at",
+    )
+
+
+def _export_sql(group: str) -> str:
+    columns = "".join(f"d.{c}, " for c in LEDGER_COLUMNS[group])
+    return f"""
+        SELECT d.entry_date, d.item_id, i.name AS item_name, {columns}
+               COALESCE(pi.price_ksh, 0) AS price_ksh,
+               d.submitted_by, d.submitted_at
+        FROM {TABLE_BY_GROUP[group]} d
+        JOIN items i ON i.id = d.item_id
+        {price_as_of_join("pi", "d.item_id", "d.entry_date")}
+        WHERE d.entry_date BETWEEN %s AND %s
+        ORDER BY d.entry_date, i.name
+    """
+
+
+def iter_daily_batches(
+    group: str,
+    date_from: date,
+    date_to: date,
+    batch_size: int = 5000,
+) -> Iterator[list[dict[str, Any]]]:
+    """Yield a ledger's rows (item name, as-of price) batch_size at a time."""
+    if group not in LEDGER_COLUMNS:
+        raise ValueError(f"unknown_ledger:{group}")
+    with get_stream_conn() as conn:
+        with conn.cursor(name=f"export_{group}") as cur:
+            cur.itersize = batch_size
+            cur.execute(_export_sql(group), (date_from, date_to))
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+
+
+def iter_daily_rows(
+    group: str, date_from: date, date_to: date
+) -> Iterator[dict[str, Any]]:
+    for batch in iter_daily_batches(group, date_from, date_to):
+        yield from batch
+
+
+def ledger_parquet_schema(group: str) -> Any:
+    """pyarrow schema matching _export_sql's columns (pyarrow must be installed)."""
+    import pyarrow as pa
+
+    quantity = pa.decimal128(10, 2)
+    return pa.schema(
+        [
+            ("entry_date", pa.date32()),
+            ("item_id", pa.int32()),
+            ("item_name", pa.string()),
+            *((c, quantity) for c in LEDGER_COLUMNS[group]),
+            ("price_ksh", pa.decimal128(10, 2)),
+            ("submitted_by", pa.int32()),
+            ("submitted_at", pa.timestamp("us", tz="UTC")),
+        ]
+    )
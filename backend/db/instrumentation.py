@@ -0,0 +1,374 @@
+"""Per-request SQL statistics: statement count, DB time, pool wait, slowest.
+
+The app middleware opens a RequestStats for each request; the pools' cursor
+factories and get_conn record into whichever one is current. Outside a
+request (scripts, migrations) nothing is recorded.
+
+Times are client-side: in pipeline mode an execute only queues the statement,
+so its round trip is billed to the statement that next waits on the server.
+Server-side (named) cursors are not counted.
+
+Every statement, in a request or not, is also counted in the process-wide
+db_statement_* metrics, labelled with the innermost db.* function that ran it.
+
+Statements slower than DB_SLOW_QUERY_MS (default 500, 0 disables) are logged
+on hotel_api.slow_sql with a fingerprint, the shape of their parameters and
+the duration. Outside production (or with DB_SLOW_QUERY_EXPLAIN=true) a slow
+read-only statement is re-run once per fingerprint and interval under
+EXPLAIN (ANALYZE, BUFFERS) inside a rolled-back savepoint, and the plan is
+logged with it. Pipeline-mode connections are never explained.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import time
+from contextlib import contextmanager, suppress
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from functools import lru_cache
+from threading import Lock
+from typing import Any, Iterator, Optional
+
+import psycopg
+from psycopg import pq, sql
+from psycopg.rows import tuple_row
+
+from core.metrics import REGISTRY
+
+slow_logger = logging.getLogger("hotel_api.slow_sql")
+
+_WS = re.compile(r"\s+")
+
+STATEMENT_SECONDS = REGISTRY.histogram(
+    "db_statement_duration_seconds",
+    "Client-side SQL statement time by calling db.* function.",
+    ("function",),
+)
+
+# Plumbing modules between a db.* function and the cursor.
+_SKIP_MODULES = frozenset({"db.instrumentation", "db.connection", "db.async_connection"})
+_label_by_code: dict[Any, str] = {}
+
+
+def _caller_label() -> str:
+    """'db.<module>.<function>' of the nearest db.* frame issuing the statement."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        code = frame.f_code
+        label = _label_by_code.get(code)
+        if label is not None:
+            return label
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("db.") and module not in _SKIP_MODULES:
+            label = f"{module}.{getattr(code, 'co_qualname', code.co_name)}"
+            _label_by_code[code] = label
+            return label
+        frame = frame.f_back
+    return "other"
+
+
+def _query_text(query: Any, limit: int = 200) -> str:
+    if isinstance(query, bytes):
+        query = query.decode("utf-8", "replace")
+    elif not isinstance(query, str):
+        # psycopg.sql.Composed and friends: the repr is enough to identify it.
+        query = repr(query)
+    return _WS.sub(" ", query).strip()[:limit]
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_time: float = 0.0
+    pool_wait: float = 0.0
+    slowest_time: float = 0.0
+    slowest_query: Optional[str] = None
+
+    def record_query(self, query: Any, elapsed: float) -> None:
+        self.queries += 1
+        self.db_time += elapsed
+        if elapsed > self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_query = _query_text(query)
+
+    def record_pool_wait(self, elapsed: float) -> None:
+        self.pool_wait += elapsed
+
+    def server_timing(self, total: float) -> str:
+        """Server-Timing header value (durations in ms)."""
+        return ", ".join(
+            [
+                f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"',
+                f"db-slowest;dur={self.slowest_time * 1000:.1f}",
+                f"pool;dur={self.pool_wait * 1000:.1f}",
+                f"total;dur={total * 1000:.1f}",
+            ]
+        )
+
+    def as_log_fields(self) -> dict[str, Any]:
+        return {
+            "db_queries": self.queries,
+            "db_ms": round(self.db_time * 1000, 1),
+            "pool_wait_ms": round(self.pool_wait * 1000, 1),
+            "slowest_ms": round(self.slowest_time * 1000, 1),
+            "slowest_sql": self.slowest_query,
+        }
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_db_stats", default=None)
+
+
+def start_request() -> tuple[RequestStats, Token]:
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def end_request(token: Token) -> None:
+    _current.reset(token)
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _current.get()
+
+
+def record_pool_wait(elapsed: float) -> None:
+    stats = _current.get()
+    if stats is not None:
+        stats.record_pool_wait(elapsed)
+
+
+# Default for DB_SLOW_QUERY_EXPLAIN when unset; app.main turns it on outside
+# production. Off for anything else importing db.* (scripts, benchmarks).
+_explain_by_default = False
+
+
+def configure_slow_query_explain(default_enabled: bool) -> None:
+    """Whether slow reads are EXPLAINed when DB_SLOW_QUERY_EXPLAIN is unset."""
+    global _explain_by_default
+    _explain_by_default = default_enabled
+    _slow_settings.cache_clear()
+
+
+@lru_cache(maxsize=1)
+def _slow_settings() -> tuple[float, bool, float]:
+    """(threshold seconds, explain enabled, seconds between explains per fingerprint).
+
+    Read on first use, after the app has loaded backend/.env.
+    """
+    try:
+        threshold_ms = float(os.getenv("DB_SLOW_QUERY_MS", "500"))
+    except ValueError:
+        threshold_ms = 500.0
+    explain = os.getenv("DB_SLOW_QUERY_EXPLAIN", "").strip().lower()
+    explain_enabled = explain in ("1", "true", "yes") if explain else _explain_by_default
+    try:
+        interval = float(os.getenv("DB_SLOW_QUERY_EXPLAIN_INTERVAL_SEC", "300"))
+    except ValueError:
+        interval = 300.0
+    return threshold_ms / 1000, explain_enabled, interval
+
+
+def _fingerprint(query: Any) -> tuple[str, str]:
+    """(short hash, normalized text); statements here are parameterized already."""
+    text = _query_text(query, limit=100_000)
+    return hashlib.sha1(text.encode()).hexdigest()[:12], text[:500]
+
+
+def _params_shape(params: Any) -> Any:
+    """Types and sizes of the parameters, never their values."""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {k: _params_shape(v) for k, v in params.items()}
+    if isinstance(params, (list, tuple)):
+        kinds = {type(p).__name__ for p in params}
+        if len(params) > 3 and len(kinds) == 1:
+            return f"{kinds.pop()}[{len(params)}]"
+        return [_params_shape(p) for p in params]
+    return type(params).__name__
+
+
+# Only plain reads are re-run under EXPLAIN ANALYZE.
+_NOT_READ_ONLY = re.compile(
+    r"\b(INSERT|UPDATE|DELETE|MERGE|TRUNCATE|COPY|CALL|DO|CREATE|ALTER|DROP|GRANT|"
+    r"nextval|setval|pg_advisory\w*|FOR\s+(NO\s+KEY\s+)?UPDATE|FOR\s+(KEY\s+)?SHARE)\b",
+    re.IGNORECASE,
+)
+_last_explained: dict[str, float] = {}
+_explain_lock = Lock()
+
+
+@dataclass
+class _Timing:
+    query: Any
+    params: Any
+    function: str = "other"
+    elapsed: float = 0.0
+    slow: bool = False
+
+
+@contextmanager
+def _timed(query: Any, params: Any = None) -> Iterator[_Timing]:
+    stats = _current.get()
+    timing = _Timing(query, params, _caller_label())
+    start = time.perf_counter()
+    try:
+        yield timing
+    finally:
+        timing.elapsed = elapsed = time.perf_counter() - start
+        STATEMENT_SECONDS.observe(elapsed, timing.function)
+        if stats is not None:
+            stats.record_query(query, elapsed)
+        threshold = _slow_settings()[0]
+        if threshold > 0 and elapsed >= threshold:
+            timing.slow = True
+
+
+def _log_slow(timing: _Timing, plan: Optional[str] = None) -> None:
+    digest, text = _fingerprint(timing.query)
+    slow_logger.warning(
+        json.dumps(
+            {
+                "fingerprint": digest,
+                "function": timing.function,
+                "duration_ms": round(timing.elapsed * 1000, 1),
+                "params": _params_shape(timing.params),
+                "sql": text,
+                **({"plan": plan} if plan is not None else {}),
+            },
+            default=str,
+        )
+    )
+
+
+def _explain_wanted(conn: Any, timing: _Timing) -> bool:
+    _, explain_enabled, interval = _slow_settings()
+    if not explain_enabled or conn.pgconn.pipeline_status != pq.PipelineStatus.OFF:
+        return False
+    text = _query_text(timing.query, limit=100_000)
+    if not text.lstrip("( ").upper().startswith(("SELECT", "WITH", "VALUES", "TABLE")):
+        return False
+    if _NOT_READ_ONLY.search(text):
+        return False
+    digest = _fingerprint(timing.query)[0]
+    now = time.monotonic()
+    with _explain_lock:
+        if now - _last_explained.get(digest, float("-inf")) < interval:
+            return False
+        _last_explained[digest] = now
+    return True
+
+
+def _explain_query(query: Any) -> Any:
+    prefix = "EXPLAIN (ANALYZE, BUFFERS) "
+    if isinstance(query, sql.Composable):
+        return sql.SQL(prefix) + query
+    if isinstance(query, bytes):
+        return prefix.encode() + query
+    return prefix + query
+
+
+def _plan_text(rows: list[tuple]) -> str:
+    return "\n".join(str(r[0]) for r in rows)
+
+
+def check_connection(conn: psycopg.Connection) -> None:
+    """Pool checkout ping on a plain cursor, so it is not counted as a statement.
+
+    Same as ConnectionPool.check_connection otherwise. It runs inside the
+    checkout, so its time is already part of the caller's pool wait.
+    """
+    autocommit = conn.autocommit
+    conn.autocommit = True
+    try:
+        psycopg.Cursor(conn).execute("")
+    finally:
+        if not autocommit:
+            # Avoid clobbering an exception if the connection is closed.
+            with suppress(Exception):
+                conn.autocommit = False
+
+
+async def check_async_connection(conn: psycopg.AsyncConnection) -> None:
+    """Async check_connection."""
+    autocommit = conn.autocommit
+    await conn.set_autocommit(True)
+    try:
+        await psycopg.AsyncCursor(conn).execute("")
+    finally:
+        if not autocommit:
+            with suppress(Exception):
+                await conn.set_autocommit(False)
+
+
+class InstrumentedCursor(psycopg.Cursor):
+    def execute(self, query, params=None, **kwargs):
+        with _timed(query, params) as timing:
+            result = super().execute(query, params, **kwargs)
+        if timing.slow:
+            self._report_slow(timing)
+        return result
+
+    def _report_slow(self, timing: _Timing) -> None:
+        plan = None
+        conn = self.connection
+        if _explain_wanted(conn, timing):
+            try:
+                # A plain cursor: the EXPLAIN itself is neither counted nor
+                # explained. force_rollback undoes anything ANALYZE did.
+                with conn.transaction(force_rollback=True):
+                    cur = psycopg.Cursor(conn, row_factory=tuple_row)
+                    plan = _plan_text(
+                        cur.execute(_explain_query(timing.query), timing.params).fetchall()
+                    )
+            except psycopg.Error as exc:
+                plan = f"EXPLAIN failed: {exc}"
+        _log_slow(timing, plan)
+
+    def executemany(self, query, params_seq, **kwargs):
+        with _timed(query) as timing:
+            result = super().executemany(query, params_seq, **kwargs)
+        if timing.slow:
+            _log_slow(timing)
+        return result
+
+    @contextmanager
+    def copy(self, statement, params=None, **kwargs):
+        with _timed(statement, params) as timing:
+            with super().copy(statement, params, **kwargs) as copy:
+                yield copy
+        if timing.slow:
+            _log_slow(timing)
+
+
+class InstrumentedAsyncCursor(psycopg.AsyncCursor):
+    async def execute(self, query, params=None, **kwargs):
+        with _timed(query, params) as timing:
+            result = await super().execute(query, params, **kwargs)
+        if timing.slow:
+            await self._report_slow(timing)
+        return result
+
+    async def _report_slow(self, timing: _Timing) -> None:
+        plan = None
+        conn = self.connection
+        if _explain_wanted(conn, timing):
+            try:
+                async with conn.transaction(force_rollback=True):
+                    cur = psycopg.AsyncCursor(conn, row_factory=tuple_row)
+                    await cur.execute(_explain_query(timing.query), timing.params)
+                    plan = _plan_text(await cur.fetchall())
+            except psycopg.Error as exc:
+                plan = f"EXPLAIN failed: {exc}"
+        _log_slow(timing, plan)
+
+    async def executemany(self, query, params_seq, **kwargs):
+        with _timed(query) as timing:
+            result = await super().executemany(query, params_seq, **kwargs)
+        if timing.slow:
+            _log_slow(timing)
+        return result
@@ -1,7 +1,15 @@
 from typing import Any, Optional
 
 from db.connection import get_conn
-from db.price_sql import CATALOG_PRICE_EPOCH, hotel_today
+from db.day_cache import day_cache
+from db.price_sql import (
+    CATALOG_PRICE_EPOCH,
+    bump_catalog_version,
+    hotel_today,
+    price_timeline,
+    sync_price_intervals,
+)
+from db.sales_rollup import refresh_sales_for_items
 
 
 def _with_float_price(row: dict[str, Any]) -> dict[str, Any]:
@@ -45,7 +53,7 @@ def get_item(item_id: int) -> Optional[dict[str, Any]]:
 def create_food_item(
     name: str, price_ksh: float, user_id: Optional[int] = None
 ) -> dict[str, Any]:
-    with get_conn() as conn:
+    with get_conn(pipeline=True) as conn:
         row = conn.execute(
             """
             INSERT INTO items (name, group_type, is_active)
@@ -64,7 +72,10 @@ def create_food_item(
             """,
             (item["id"], price_ksh, CATALOG_PRICE_EPOCH, user_id),
         )
+        sync_price_intervals(conn, [item["id"]])
         conn.commit()
+        price_timeline.invalidate([item["id"]])
+        day_cache.bump_all()
         item["price_ksh"] = float(price_ksh)
         return item
 
@@ -77,7 +88,7 @@ def create_snacks_drinks_item(
 ) -> dict[str, Any]:
     if subcategory not in ("snacks", "drinks"):
         raise ValueError("subcategory must be 'snacks' or 'drinks'")
-    with get_conn() as conn:
+    with get_conn(pipeline=True) as conn:
         row = conn.execute(
             """
             INSERT INTO items (name, group_type, is_active, subcategory)
@@ -97,13 +108,16 @@ def create_snacks_drinks_item(
             """,
             (item["id"], price_ksh, CATALOG_PRICE_EPOCH, user_id),
         )
+        sync_price_intervals(conn, [item["id"]])
         conn.commit()
+        price_timeline.invalidate([item["id"]])
+        day_cache.bump_all()
         item["price_ksh"] = float(price_ksh)
         return item
 
 
 def create_stock_item(name: str, user_id: Optional[int] = None) -> dict[str, Any]:
-    with get_conn() as conn:
+    with get_conn(pipeline=True) as conn:
         row = conn.execute(
             """
             INSERT INTO items (name, group_type, is_active)
@@ -130,7 +144,11 @@ def create_stock_item(name: str, user_id: Optional[int] = None) -> dict[str, Any
                 """,
                 (item["id"], CATALOG_PRICE_EPOCH, user_id),
             )
+            sync_price_intervals(conn, [item["id"]])
+        else:
+            bump_catalog_version(conn)
         conn.commit()
+        price_timeline.invalidate([item["id"]])
         return item
 
 
@@ -140,7 +158,9 @@ def deactivate_stock_item(item_id: int) -> bool:
             "UPDATE items SET is_active = FALSE WHERE id = %s AND group_type = 'stock'",
             (item_id,),
         )
+        bump_catalog_version(conn)
         conn.commit()
+        price_timeline.invalidate([item_id])
         return cur.rowcount > 0
 
 
@@ -170,7 +190,7 @@ def list_all_items_with_prices() -> list[dict[str, Any]]:
 
 
 def update_item_price(item_id: int, price_ksh: float, user_id: int) -> dict[str, Any]:
-    with get_conn() as conn:
+    with get_conn(pipeline=True) as conn:
         row = conn.execute(
             """
             INSERT INTO item_prices (item_id, price_ksh, effective_from, updated_by)
@@ -179,7 +199,11 @@ def update_item_price(item_id: int, price_ksh: float, user_id: int) -> dict[str,
             """,
             (item_id, price_ksh, hotel_today(), user_id),
         ).fetchone()
+        sync_price_intervals(conn, [item_id])
+        refresh_sales_for_items(conn, [item_id])
         conn.commit()
+        price_timeline.invalidate([item_id])
+        day_cache.bump_all()
         result = dict(row)
         result["price_ksh"] = float(result["price_ksh"])
         return result
@@ -200,7 +224,11 @@ def update_item_subcategory(item_id: int, subcategory: str) -> dict[str, Any]:
         ).fetchone()
         if not row:
             raise LookupError("Item not found or not snacks_drinks")
+        refresh_sales_for_items(conn, [item_id])
+        bump_catalog_version(conn)
         conn.commit()
+        price_timeline.invalidate([item_id])
+        day_cache.bump_all()
         return dict(row)
 
 
@@ -211,7 +239,7 @@ def upsert_catalog_item(
     display_order: int = 0,
     subcategory: Optional[str] = None,
 ) -> int:
-    with get_conn() as conn:
+    with get_conn(pipeline=True) as conn:
         row = conn.execute(
             """
             INSERT INTO items (name, group_type, is_active, display_order, subcategory)
@@ -247,5 +275,9 @@ def upsert_catalog_item(
                 """,
                 (item_id, price_ksh, CATALOG_PRICE_EPOCH),
             )
+        sync_price_intervals(conn, [item_id])
+        refresh_sales_for_items(conn, [item_id])
         conn.commit()
+        price_timeline.invalidate([item_id])
+        day_cache.bump_all()
         return item_id
@@ -0,0 +1,98 @@
+"""Opt-in adaptive max_size for the connection pools (DB_POOL_ADAPTIVE=true).
+
+Every DB_POOL_ADAPT_INTERVAL_SEC the pools' stats are sampled. A pool whose
+checkouts queued in GROW_AFTER consecutive samples gets STEP more connections,
+up to DB_POOL_ADAPT_MAX_FACTOR x its configured max_size. After SHRINK_AFTER
+samples without any checkout it steps back toward the configured size; the
+pool's max_idle then closes the surplus connections, so an idle Neon branch
+is not kept busy by connections opened for a past spike.
+"""
+
+import asyncio
+import logging
+import math
+import os
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from db.async_connection import open_async_pools
+from db.connection import open_pools
+
+logger = logging.getLogger("hotel_api.pools")
+
+GROW_AFTER = 2
+SHRINK_AFTER = 20
+STEP = 2
+
+
+def adaptive_enabled() -> bool:
+    return os.getenv("DB_POOL_ADAPTIVE", "false").strip().lower() in ("1", "true", "yes")
+
+
+def _float_env(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+@dataclass
+class PoolAutosizer:
+    """Sizing decisions for one pool from successive get_stats() samples."""
+
+    base_max: int
+    ceiling: int
+    _last_num: Optional[int] = None
+    _last_queued: int = 0
+    _queued_streak: int = 0
+    _idle_streak: int = 0
+
+    def observe(self, stats: dict[str, Any]) -> Optional[int]:
+        """Return a new max_size for the pool, or None to leave it alone."""
+        num = stats.get("requests_num", 0)
+        queued = stats.get("requests_queued", 0)
+        first = self._last_num is None
+        checkouts = 0 if first else num - self._last_num
+        newly_queued = 0 if first else queued - self._last_queued
+        self._last_num, self._last_queued = num, queued
+        if first:
+            return None
+
+        current = stats["pool_max"]
+        if newly_queued > 0 or stats.get("requests_waiting", 0) > 0:
+            self._idle_streak = 0
+            self._queued_streak += 1
+            if self._queued_streak >= GROW_AFTER and current < self.ceiling:
+                self._queued_streak = 0
+                return min(self.ceiling, current + STEP)
+        elif checkouts == 0:
+            self._queued_streak = 0
+            self._idle_streak += 1
+            if self._idle_streak >= SHRINK_AFTER and current > self.base_max:
+                self._idle_streak = 0
+                return max(self.base_max, current - STEP)
+        else:
+            self._queued_streak = self._idle_streak = 0
+        return None
+
+
+async def run_pool_autosizer() -> None:
+    """Sample and resize all open pools until cancelled (app lifespan task)."""
+    interval = max(1.0, _float_env("DB_POOL_ADAPT_INTERVAL_SEC", 15))
+    factor = max(1.0, _float_env("DB_POOL_ADAPT_MAX_FACTOR", 2))
+    sizers: dict[str, PoolAutosizer] = {}
+    while True:
+        await asyncio.sleep(interval)
+        for pool in [*open_pools(), *open_async_pools()]:
+            stats = pool.get_stats()
+            sizer = sizers.get(pool.name)
+            if sizer is None:
+                base = stats["pool_max"]
+                sizer = sizers[pool.name] = PoolAutosizer(base, math.ceil(base * factor))
+            new_max = sizer.observe(stats)
+            if new_max is None:
+                continue
+            logger.info("resizing pool %s max_size %s -> %s", pool.name, stats["pool_max"], new_max)
+            resized = pool.resize(stats["pool_min"], new_max)
+            if asyncio.iscoroutine(resized):
+                await resized
@@ -9,11 +9,29 @@ entry), the lookup returned NULL and COALESCE forced price to 0.
 
 Fallback: if no as-of match exists, use the earliest known price for the item
 so newly added dishes still show their catalog price on any entry date.
+
+Both rules are materialized in item_price_intervals (migration 010): one row
+per [valid_from, valid_to) with the earliest price on (-infinity, first date).
+Reads join that table on a date range; writes to item_prices must call
+sync_price_intervals in the same transaction. That also bumps
+catalog_version (migration 014), the validator HTTP caches read for
+catalog and price changes.
+
+Python-side consumers resolve the same rules from `price_timeline`, an
+in-process cache that price writers invalidate after commit.
 """
 
+import os
+import time
+from bisect import bisect_right
 from datetime import date, datetime
+from threading import Lock
+from typing import Iterable, Optional
 from zoneinfo import ZoneInfo
 
+from core.metrics import cache_result
+from db.connection import get_conn
+
 HOTEL_TZ = ZoneInfo("Africa/Nairobi")
 
 # First price for a brand-new dish applies from this date so any entry date works.
@@ -24,17 +42,209 @@ def hotel_today() -> date:
     return datetime.now(HOTEL_TZ).date()
 
 
+def price_as_of_join(alias: str, item_id_sql: str, as_of_sql: str) -> str:
+    """LEFT JOIN clause exposing `{alias}.price_ksh` (NULL when the item has no price)."""
+    return f"""LEFT JOIN item_price_intervals {alias}
+  ON {alias}.item_id = {item_id_sql}
+ AND {alias}.valid_from <= {as_of_sql}
+ AND {as_of_sql} < {alias}.valid_to"""
+
+
 def price_as_of_expr(item_id_sql: str, as_of_sql: str) -> str:
     """SQL expression returning price_ksh (as-of, else earliest, else 0)."""
     return f"""COALESCE(
-  (SELECT ip.price_ksh FROM item_prices ip
-   WHERE ip.item_id = {item_id_sql}
-     AND ip.effective_from <= {as_of_sql}
-   ORDER BY ip.effective_from DESC, ip.id DESC
-   LIMIT 1),
-  (SELECT ip.price_ksh FROM item_prices ip
-   WHERE ip.item_id = {item_id_sql}
-   ORDER BY ip.effective_from ASC, ip.id ASC
-   LIMIT 1),
+  (SELECT pi.price_ksh FROM item_price_intervals pi
+   WHERE pi.item_id = {item_id_sql}
+     AND pi.valid_from <= {as_of_sql}
+     AND {as_of_sql} < pi.valid_to),
   0
 )"""
+
+
+_REBUILD_INTERVALS_SQL = """
+WITH per_day AS (
+  SELECT DISTINCT ON (item_id, effective_from)
+         id, item_id, effective_from, price_ksh
+  FROM item_prices
+  WHERE item_id = ANY(%(item_ids)s)
+  ORDER BY item_id, effective_from, id DESC
+),
+earliest AS (
+  SELECT DISTINCT ON (item_id)
+         id, item_id, effective_from, price_ksh
+  FROM item_prices
+  WHERE item_id = ANY(%(item_ids)s)
+  ORDER BY item_id, effective_from ASC, id ASC
+)
+INSERT INTO item_price_intervals (item_id, valid_from, valid_to, price_ksh, price_id)
+SELECT item_id, '-infinity'::date, effective_from, price_ksh, id
+FROM earliest
+UNION ALL
+SELECT item_id,
+       effective_from,
+       COALESCE(
+         LEAD(effective_from) OVER (PARTITION BY item_id ORDER BY effective_from),
+         'infinity'::date
+       ),
+       price_ksh,
+       id
+FROM per_day
+"""
+
+
+def bump_catalog_version(conn) -> None:
+    """Mark items / item_prices as changed for HTTP validators (caller commits)."""
+    conn.execute("UPDATE catalog_version SET version = version + 1")
+
+
+def sync_price_intervals(conn, item_ids: Iterable[int]) -> None:
+    """Rebuild item_price_intervals for the given items (caller commits)."""
+    ids = sorted({int(i) for i in item_ids})
+    if not ids:
+        return
+    # Row-lock the items so concurrent price writes rebuild one after another.
+    conn.execute(
+        "SELECT id FROM items WHERE id = ANY(%s) ORDER BY id FOR UPDATE",
+        (ids,),
+    )
+    conn.execute(
+        "DELETE FROM item_price_intervals WHERE item_id = ANY(%s)",
+        (ids,),
+    )
+    conn.execute(_REBUILD_INTERVALS_SQL, {"item_ids": ids})
+    bump_catalog_version(conn)
+
+
+def _ttl_env(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+class PriceTimeline:
+    """Process-level as-of price lookup backed by per-item sorted arrays.
+
+    Loads item_prices once and answers "price of item X on date D" with
+    bisect, applying the same as-of / earliest / 0 rules as the SQL above.
+    Item and price writers call invalidate() after commit; an item the
+    cache has not seen yet (e.g. created by another process) is loaded on
+    first lookup, and a TTL reloads everything so price edits made outside
+    this process are picked up.
+    """
+
+    def __init__(self, ttl_seconds: float = 300) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._dates: dict[int, list[date]] = {}
+        self._prices: dict[int, list[float]] = {}
+        self._stale: set[int] = set()
+        # Items covered by the last full load or loaded since (with or without prices).
+        self._known: set[int] = set()
+        self._loaded_at: Optional[float] = None
+        # Bumped by invalidate() so a load racing a price write stays stale.
+        self._generation = 0
+        self._lock = Lock()
+
+    @staticmethod
+    def _query(item_ids: Optional[list[int]]) -> tuple[str, tuple]:
+        query = "SELECT item_id, effective_from, price_ksh FROM item_prices"
+        params: tuple = ()
+        if item_ids is not None:
+            query += " WHERE item_id = ANY(%s)"
+            params = (item_ids,)
+        # (effective_from, id) order: the last row on a date wins as-of ties,
+        # the first row overall is the earliest-price fallback.
+        query += " ORDER BY item_id, effective_from, id"
+        return query, params
+
+    @staticmethod
+    def _build(rows) -> dict[int, tuple[list[date], list[float]]]:
+        timeline: dict[int, tuple[list[date], list[float]]] = {}
+        for row in rows:
+            dates, prices = timeline.setdefault(int(row["item_id"]), ([], []))
+            dates.append(row["effective_from"])
+            prices.append(float(row["price_ksh"]))
+        return timeline
+
+    def _fetch(self, conn, item_ids: Optional[list[int]]) -> dict[int, tuple[list[date], list[float]]]:
+        return self._build(conn.execute(*self._query(item_ids)).fetchall())
+
+    def _load(self, conn, item_ids: Optional[list[int]]) -> None:
+        generation = self._generation
+        if conn is None:
+            with get_conn() as own_conn:
+                timeline = self._fetch(own_conn, item_ids)
+        else:
+            timeline = self._fetch(conn, item_ids)
+        self._store(generation, item_ids, timeline)
+
+    def _store(
+        self,
+        generation: int,
+        item_ids: Optional[list[int]],
+        timeline: dict[int, tuple[list[date], list[float]]],
+    ) -> None:
+        with self._lock:
+            unchanged = generation == self._generation
+            if item_ids is None:
+                self._dates = {k: v[0] for k, v in timeline.items()}
+                self._prices = {k: v[1] for k, v in timeline.items()}
+                self._known = set(timeline)
+                self._loaded_at = time.monotonic()
+                if unchanged:
+                    self._stale.clear()
+                return
+            self._known.update(item_ids)
+            for item_id in item_ids:
+                if unchanged:
+                    self._stale.discard(item_id)
+                if item_id in timeline:
+                    self._dates[item_id], self._prices[item_id] = timeline[item_id]
+                else:
+                    self._dates.pop(item_id, None)
+                    self._prices.pop(item_id, None)
+
+    def _needs_load(self, item_ids: list[int]) -> Optional[list[int]]:
+        """Items to reload: None for a full reload, [] when all are fresh."""
+        loaded_at = self._loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at > self.ttl_seconds:
+            return None
+        return [i for i in item_ids if i in self._stale or i not in self._known]
+
+    def _ensure_fresh(self, conn, item_ids: list[int]) -> None:
+        stale = self._needs_load(item_ids)
+        cache_result("price_timeline", stale == [])
+        if stale is None or stale:
+            self._load(conn, stale)
+
+    def _lookup(self, item_id: int, as_of: date) -> float:
+        with self._lock:
+            dates = self._dates.get(item_id)
+            prices = self._prices.get(item_id)
+        if not dates or not prices:
+            return 0.0
+        idx = bisect_right(dates, as_of) - 1
+        return prices[idx] if idx >= 0 else prices[0]
+
+    def price_on(self, item_id: int, as_of: date, conn=None) -> float:
+        """As-of price (else earliest, else 0). Pass conn to load inside a transaction."""
+        item_id = int(item_id)
+        self._ensure_fresh(conn, [item_id])
+        return self._lookup(item_id, as_of)
+
+    def prices_on(self, item_ids: Iterable[int], as_of: date, conn=None) -> dict[int, float]:
+        ids = [int(i) for i in item_ids]
+        self._ensure_fresh(conn, ids)
+        return {item_id: self._lookup(item_id, as_of) for item_id in ids}
+
+    def invalidate(self, item_ids: Optional[Iterable[int]] = None) -> None:
+        """Drop cached prices for item_ids (all items when None)."""
+        with self._lock:
+            self._generation += 1
+            if item_ids is None:
+                self._loaded_at = None
+            else:
+                self._stale.update(int(i) for i in item_ids)
+
+
+price_timeline = PriceTimeline(ttl_seconds=_ttl_env("PRICE_CACHE_TTL_SEC", 300))
@@ -0,0 +1,111 @@
+"""daily_item_sales rollup maintenance (see migrations/011_daily_item_sales.sql).
+
+Rows are rebuilt for exactly the dates or items a write touched, inside the
+writer's transaction, so readers never see a rollup out of step with the
+daily tables.
+"""
+
+from datetime import date
+from typing import Iterable
+
+from db.price_sql import price_as_of_join
+
+
+def _rollup_select(snacks_filter: str, food_filter: str) -> str:
+    return f"""
+    SELECT s.entry_date, s.item_id, s.category, s.opening_stock, s.added_stock,
+           s.closing_stock, s.sold_units, s.price_ksh, s.sold_units * s.price_ksh
+    FROM (
+      SELECT cur.entry_date, cur.item_id, i.subcategory AS category,
+             COALESCE(prev.closing_stock, 0) AS opening_stock,
+             COALESCE(cur.added_stock, 0) AS added_stock,
+             cur.closing_stock,
+             GREATEST(
+               COALESCE(prev.closing_stock, 0)
+                 + COALESCE(cur.added_stock, 0)
+                 - cur.closing_stock,
+               0
+             ) AS sold_units,
+             COALESCE(pi.price_ksh, 0) AS price_ksh
+      FROM snacks_drinks_daily cur
+      JOIN items i ON i.id = cur.item_id
+      LEFT JOIN snacks_drinks_daily prev
+        ON prev.item_id = cur.item_id
+       AND prev.entry_date = (cur.entry_date - INTERVAL '1 day')::date
+      {price_as_of_join("pi", "i.id", "cur.entry_date")}
+      WHERE {snacks_filter}
+        AND cur.closing_stock IS NOT NULL
+        AND i.group_type = 'snacks_drinks'
+        AND i.subcategory IN ('snacks', 'drinks')
+      UNION ALL
+      SELECT f.entry_date, f.item_id,
+             CASE WHEN LOWER(i.name) LIKE '%%kuku%%' THEN 'kuku' ELSE 'food' END,
+             NULL, NULL, NULL,
+             f.quantity,
+             COALESCE(pi.price_ksh, 0)
+      FROM food_kuku_daily f
+      JOIN items i ON i.id = f.item_id
+      {price_as_of_join("pi", "i.id", "f.entry_date")}
+      WHERE {food_filter}
+        AND i.group_type = 'food_kuku'
+        AND COALESCE(f.quantity, 0) > 0
+    ) s
+    """
+
+
+def _refresh_sql(rollup_filter: str, snacks_filter: str, food_filter: str) -> str:
+    # Upsert + delete-missing (rather than delete-all + insert) so a save and a
+    # concurrent price edit refreshing overlapping rows cannot collide on the key.
+    return f"""
+    WITH fresh AS (
+      {_rollup_select(snacks_filter, food_filter)}
+    ),
+    upserted AS (
+      INSERT INTO daily_item_sales (
+        entry_date, item_id, category, opening_stock, added_stock,
+        closing_stock, sold_units, price_ksh, revenue
+      )
+      SELECT * FROM fresh
+      ON CONFLICT (entry_date, item_id) DO UPDATE
+        SET category = EXCLUDED.category,
+            opening_stock = EXCLUDED.opening_stock,
+            added_stock = EXCLUDED.added_stock,
+            closing_stock = EXCLUDED.closing_stock,
+            sold_units = EXCLUDED.sold_units,
+            price_ksh = EXCLUDED.price_ksh,
+            revenue = EXCLUDED.revenue
+    )
+    DELETE FROM daily_item_sales d
+    WHERE {rollup_filter}
+      AND NOT EXISTS (
+        SELECT 1 FROM fresh
+        WHERE fresh.entry_date = d.entry_date AND fresh.item_id = d.item_id
+      )
+    """
+
+
+_REFRESH_DATES_SQL = _refresh_sql(
+    "d.entry_date = ANY(%(dates)s)",
+    "cur.entry_date = ANY(%(dates)s)",
+    "f.entry_date = ANY(%(dates)s)",
+)
+
+_REFRESH_ITEMS_SQL = _refresh_sql(
+    "d.item_id = ANY(%(item_ids)s)",
+    "cur.item_id = ANY(%(item_ids)s)",
+    "f.item_id = ANY(%(item_ids)s)",
+)
+
+
+def refresh_sales_for_dates(conn, dates: Iterable[date]) -> None:
+    """Rebuild rollup rows for the given entry dates (caller commits)."""
+    days = sorted(set(dates))
+    if days:
+        conn.execute(_REFRESH_DATES_SQL, {"dates": days})
+
+
+def refresh_sales_for_items(conn, item_ids: Iterable[int]) -> None:
+    """Rebuild all rollup rows of the given items, e.g. after a price change."""
+    ids = sorted({int(i) for i in item_ids})
+    if ids:
+        conn.execute(_REFRESH_ITEMS_SQL, {"item_ids": ids})
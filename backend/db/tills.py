@@ -1,8 +1,10 @@
+import asyncio
 from datetime import date, timedelta
 from typing import Any
 
-from db.audit_sales import sales_report
-from db.connection import get_tills_phone_number, get_transaction_conn
+from db.async_connection import get_async_transaction_conn
+from db.audit_sales import sales_report_async
+from db.connection import get_tills_phone_number
 
 
 class TillsConfigError(Exception):
@@ -22,34 +24,54 @@ def _pct(tills: float, sales: float) -> float:
     return (tills / sales) * 100.0
 
 
-def tills_report(date_from: date, date_to: date) -> dict[str, Any]:
+_TILLS_CREDIT_SQL = """
+    SELECT value_date::date AS day,
+           COALESCE(SUM(credit), 0) AS total_credit
+    FROM transactions
+    WHERE phone_number = %s
+      AND value_date >= %s
+      AND value_date <= %s
+      AND credit IS NOT NULL
+      AND credit > 0
+    GROUP BY 1
+    ORDER BY 1
+    """
+
+
+def _require_phone() -> str:
     phone = get_tills_phone_number()
     if not phone:
         raise TillsConfigError("PHONE_NUMBER is not set")
+    return phone
 
+
+async def _credit_rows_async(phone: str, date_from: date, date_to: date) -> list:
     try:
-        with get_transaction_conn() as conn:
-            rows = conn.execute(
-                """
-                SELECT value_date::date AS day,
-                       COALESCE(SUM(credit), 0) AS total_credit
-                FROM transactions
-                WHERE phone_number = %s
-                  AND value_date >= %s
-                  AND value_date <= %s
-                  AND credit IS NOT NULL
-                  AND credit > 0
-                GROUP BY 1
-                ORDER BY 1
-                """,
-                (phone, date_from, date_to),
-            ).fetchall()
+        async with get_async_transaction_conn() as conn:
+            cur = await conn.execute(_TILLS_CREDIT_SQL, (phone, date_from, date_to))
+            return await cur.fetchall()
     except RuntimeError as exc:
         raise TillsConfigError(str(exc)) from exc
 
-    by_day = {row["day"]: float(row["total_credit"]) for row in rows}
 
-    hotel = sales_report(date_from, date_to)
+async def tills_report_async(date_from: date, date_to: date) -> dict[str, Any]:
+    phone = _require_phone()
+    # Transactions DB and hotel DB are independent; query both at once.
+    rows, hotel = await asyncio.gather(
+        _credit_rows_async(phone, date_from, date_to),
+        sales_report_async(date_from, date_to),
+    )
+    return _build_tills_report(date_from, date_to, phone, rows, hotel)
+
+
+def _build_tills_report(
+    date_from: date,
+    date_to: date,
+    phone: str,
+    rows,
+    hotel: dict[str, Any],
+) -> dict[str, Any]:
+    by_day = {row["day"]: float(row["total_credit"]) for row in rows}
     sales_by_day = {
         row["entry_date"]: float(row["total"]) for row in hotel["timeseries"]
     }
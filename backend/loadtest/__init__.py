@@ -0,0 +1,4 @@
+"""HTTP load test: a shift of concurrent clerks and admins against one API worker.
+
+See loadtest/run.py for the setup steps and options.
+"""
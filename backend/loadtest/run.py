@@ -0,0 +1,311 @@
+"""Simulate a shift of clerks and admins against a running API; report latency.
+
+Setup (local stand-in Postgres, never Neon):
+
+    # 1. load synthetic data (also runs the migrations)
+    BENCH_DATABASE_URL=postgresql://localhost/hotel_bench python -m benchmarks.run --repeat 1
+    # 2. one API worker on that database
+    DATABASE_URL=postgresql://localhost/hotel_bench \\
+    TRANSACTION_DATABASE_URL=postgresql://localhost/hotel_bench \\
+    PHONE_NUMBER=0700000001 uvicorn app.main:app --workers 1 --port 8000
+    # 3. the shift
+    python -m loadtest.run --clerks 12 --admins 3 --duration 60
+
+Each virtual user logs in through /api/auth/login, then loops until the
+deadline: clerks GET and POST their module (snacks-drinks, food-kuku, bar),
+admins open analytics, the sales report and the tills report. Saves go to
+days after the generated history so clerk day locks do not reject them.
+
+Per endpoint it reports p50/p95/p99 latency, throughput, errors and a
+histogram of pool wait taken from the Server-Timing header (see
+db.instrumentation). A p95 pool wait well above zero means the 10-connection
+pool is the bottleneck.
+"""
+
+import argparse
+import itertools
+import json
+import random
+import re
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_ROOT))
+
+from benchmarks.dataset import BENCH_PIN, DEFAULT_END  # noqa: E402
+
+# Login first name per virtual-user kind (see benchmarks.dataset.EMPLOYEES).
+CLERK_MODULES = {
+    "Snacks": ("snacks-drinks", "closing"),
+    "Food": ("food-kuku", "quantity"),
+    "Bar": ("bar", "closing"),
+}
+ADMIN_NAME = "Bench"
+
+# Upper bounds (ms) of the pool-wait histogram buckets; the last is open-ended.
+POOL_WAIT_BUCKETS = (1, 5, 20, 100, 500)
+
+_POOL_DUR = re.compile(r"(?:^|,)\s*pool;dur=([\d.]+)")
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.pool_waits: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, label: str, status: int, elapsed_ms: float, pool_ms: Optional[float]) -> None:
+        with self._lock:
+            self.latencies[label].append(elapsed_ms)
+            if pool_ms is not None:
+                self.pool_waits[label].append(pool_ms)
+            if status >= 400:
+                self.errors[label][status] += 1
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _histogram(values: list[float]) -> dict[str, int]:
+    labels = [f"<={b}ms" for b in POOL_WAIT_BUCKETS] + [f">{POOL_WAIT_BUCKETS[-1]}ms"]
+    counts = dict.fromkeys(labels, 0)
+    for value in values:
+        for bound, label in zip(POOL_WAIT_BUCKETS, labels):
+            if value <= bound:
+                counts[label] += 1
+                break
+        else:
+            counts[labels[-1]] += 1
+    return counts
+
+
+class Client:
+    def __init__(self, base_url: str, recorder: Recorder, timeout: float) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.recorder = recorder
+        self.timeout = timeout
+        self.token: Optional[str] = None
+
+    def request(
+        self, method: str, path: str, label: str, body: Any = None
+    ) -> tuple[int, Any]:
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, headers=headers, method=method)
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                status, raw, timing = resp.status, resp.read(), resp.headers.get("Server-Timing")
+        except urllib.error.HTTPError as exc:
+            status, raw, timing = exc.code, exc.read(), exc.headers.get("Server-Timing")
+        except (urllib.error.URLError, TimeoutError):
+            status, raw, timing = 599, b"", None
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        match = _POOL_DUR.search(timing or "")
+        self.recorder.record(
+            f"{method} {label}", status, elapsed_ms, float(match.group(1)) if match else None
+        )
+        try:
+            payload = json.loads(raw) if raw else None
+        except ValueError:
+            payload = None
+        return status, payload
+
+    def login(self, first_name: str, pin: int) -> None:
+        status, payload = self.request(
+            "POST", "/api/auth/login", "/api/auth/login", {"first_name": first_name, "pin": pin}
+        )
+        if status != 200:
+            raise RuntimeError(f"login as {first_name} failed with HTTP {status}")
+        self.token = payload["access_token"]
+
+
+def _clerk_actions(
+    client: Client, name: str, history_end: date, save_days: "itertools.count[int]"
+) -> list[tuple[float, Callable[[], None]]]:
+    module, kind = CLERK_MODULES[name]
+    path = f"/api/{module}"
+    item_ids: list[int] = []
+
+    def view() -> None:
+        day = history_end - timedelta(days=random.randint(0, 30))
+        _, payload = client.request("GET", f"{path}?date={day}", path)
+        if payload and not item_ids:
+            item_ids.extend(int(e["item_id"]) for e in payload.get("entries", []))
+
+    def save() -> None:
+        if not item_ids:
+            return view()
+        day = history_end + timedelta(days=next(save_days))
+        if kind == "quantity":
+            entries = [{"item_id": i, "quantity": random.randint(0, 8)} for i in item_ids]
+        else:
+            entries = [
+                {"item_id": i, "added_stock": 100, "closing_stock": random.randint(40, 60)}
+                for i in item_ids
+            ]
+        client.request("POST", path, path, {"date": str(day), "entries": entries})
+
+    # Clerks mostly reopen their sheet, saving every few views.
+    return [(0.7, view), (0.3, save)]
+
+
+def _admin_actions(client: Client, history_end: date) -> list[tuple[float, Callable[[], None]]]:
+    def window(days: int) -> tuple[date, date]:
+        end = history_end - timedelta(days=random.randint(0, 60))
+        return end - timedelta(days=days - 1), end
+
+    def analytics() -> None:
+        day = window(1)[1]
+        client.request("GET", f"/api/analytics/sales-totals?date={day}", "/api/analytics/sales-totals")
+        category = random.choice(("snacks", "drinks", "food", "kuku"))
+        client.request(
+            "GET", f"/api/analytics/items-sold?category={category}&date={day}",
+            "/api/analytics/items-sold",
+        )
+
+    def sales_report() -> None:
+        date_from, date_to = window(random.choice((7, 30)))
+        client.request(
+            "GET", f"/api/audit/sales-report?date_from={date_from}&date_to={date_to}",
+            "/api/audit/sales-report",
+        )
+
+    def tills_report() -> None:
+        date_from, date_to = window(random.choice((7, 30)))
+        client.request(
+            "GET", f"/api/tills/report?date_from={date_from}&date_to={date_to}",
+            "/api/tills/report",
+        )
+
+    return [(0.5, analytics), (0.3, sales_report), (0.2, tills_report)]
+
+
+def _virtual_user(
+    client: Client,
+    login_name: str,
+    actions_for: Callable[[Client], list[tuple[float, Callable[[], None]]]],
+    deadline: float,
+    think_ms: float,
+    failures: list[str],
+) -> None:
+    try:
+        client.login(login_name, BENCH_PIN)
+    except RuntimeError as exc:
+        failures.append(str(exc))
+        return
+    actions = actions_for(client)
+    weights = [w for w, _ in actions]
+    while time.monotonic() < deadline:
+        random.choices(actions, weights)[0][1]()
+        if think_ms > 0:
+            time.sleep(random.expovariate(1000 / think_ms))
+
+
+def _report(recorder: Recorder, wall_s: float) -> dict[str, Any]:
+    endpoints = {}
+    for label in sorted(recorder.latencies):
+        samples = sorted(recorder.latencies[label])
+        endpoints[label] = {
+            "requests": len(samples),
+            "throughput_rps": round(len(samples) / wall_s, 2),
+            "p50_ms": round(_percentile(samples, 50), 1),
+            "p95_ms": round(_percentile(samples, 95), 1),
+            "p99_ms": round(_percentile(samples, 99), 1),
+            "errors": dict(recorder.errors.get(label, {})),
+            "pool_wait_p95_ms": round(_percentile(sorted(recorder.pool_waits[label]), 95), 1),
+            "pool_wait_histogram": _histogram(recorder.pool_waits[label]),
+        }
+    total = sum(e["requests"] for e in endpoints.values())
+    return {"wall_s": round(wall_s, 1), "requests": total,
+            "throughput_rps": round(total / wall_s, 2), "endpoints": endpoints}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--clerks", type=int, default=9, help="spread over snacks/food/bar")
+    parser.add_argument("--admins", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=60, help="seconds")
+    parser.add_argument("--think-ms", type=float, default=500, help="mean pause between actions")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--history-end", type=date.fromisoformat, default=DEFAULT_END)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="write the JSON report here")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    recorder = Recorder()
+    failures: list[str] = []
+    # Shared so concurrent saves of one module land on distinct days.
+    save_days = {name: itertools.count(1) for name in CLERK_MODULES}
+    deadline = time.monotonic() + args.duration
+    threads = []
+    clerk_names = itertools.cycle(CLERK_MODULES)
+    for _ in range(args.clerks):
+        name = next(clerk_names)
+        client = Client(args.base_url, recorder, args.timeout)
+        threads.append(
+            threading.Thread(
+                target=_virtual_user,
+                args=(
+                    client, name,
+                    lambda c, n=name: _clerk_actions(c, n, args.history_end, save_days[n]),
+                    deadline, args.think_ms, failures,
+                ),
+                daemon=True,
+            )
+        )
+    for _ in range(args.admins):
+        client = Client(args.base_url, recorder, args.timeout)
+        threads.append(
+            threading.Thread(
+                target=_virtual_user,
+                args=(
+                    client, ADMIN_NAME,
+                    lambda c: _admin_actions(c, args.history_end),
+                    deadline, args.think_ms, failures,
+                ),
+                daemon=True,
+            )
+        )
+
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    report = _report(recorder, time.monotonic() - start)
+    report["users"] = {"clerks": args.clerks, "admins": args.admins, "think_ms": args.think_ms}
+
+    for label, e in report["endpoints"].items():
+        print(
+            f"{label:<36} {e['requests']:>6} req {e['throughput_rps']:>7.2f}/s"
+            f"  p50 {e['p50_ms']:>7.1f}  p95 {e['p95_ms']:>7.1f}  p99 {e['p99_ms']:>7.1f} ms"
+            f"  pool p95 {e['pool_wait_p95_ms']:>6.1f} ms  errors {sum(e['errors'].values())}"
+        )
+    print(f"total {report['requests']} requests, {report['throughput_rps']}/s")
+    for failure in failures:
+        print(f"FAILED: {failure}")
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
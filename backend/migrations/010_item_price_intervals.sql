@@ -0,0 +1,49 @@
+-- Materialized as-of price intervals: one row per (item, [valid_from, valid_to))
+-- so reads resolve a price with a single range join instead of two sorted
+-- correlated subqueries against item_prices.
+--
+-- The leading interval (-infinity -> earliest effective_from) carries the
+-- earliest known price, matching the fallback in db/price_sql.py.
+-- Kept in sync by db.price_sql.sync_price_intervals on every price write.
+
+CREATE TABLE IF NOT EXISTS item_price_intervals (
+  item_id    INT NOT NULL REFERENCES items(id) ON DELETE CASCADE,
+  valid_from DATE NOT NULL,
+  valid_to   DATE NOT NULL,
+  price_ksh  NUMERIC(10, 2) NOT NULL,
+  price_id   INT NOT NULL,
+  PRIMARY KEY (item_id, valid_from),
+  CHECK (valid_from < valid_to)
+);
+
+CREATE INDEX IF NOT EXISTS idx_item_price_intervals_range
+  ON item_price_intervals (item_id, valid_from, valid_to) INCLUDE (price_ksh);
+
+-- Full rebuild keeps this migration idempotent on every deploy.
+DELETE FROM item_price_intervals;
+
+WITH per_day AS (
+  SELECT DISTINCT ON (item_id, effective_from)
+         id, item_id, effective_from, price_ksh
+  FROM item_prices
+  ORDER BY item_id, effective_from, id DESC
+),
+earliest AS (
+  SELECT DISTINCT ON (item_id)
+         id, item_id, effective_from, price_ksh
+  FROM item_prices
+  ORDER BY item_id, effective_from ASC, id ASC
+)
+INSERT INTO item_price_intervals (item_id, valid_from, valid_to, price_ksh, price_id)
+SELECT item_id, '-infinity'::date, effective_from, price_ksh, id
+FROM earliest
+UNION ALL
+SELECT item_id,
+       effective_from,
+       COALESCE(
+         LEAD(effective_from) OVER (PARTITION BY item_id ORDER BY effective_from),
+         'infinity'::date
+       ),
+       price_ksh,
+       id
+FROM per_day;
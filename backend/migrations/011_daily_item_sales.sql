@@ -0,0 +1,75 @@
+-- Per-day, per-item sales rollup for snacks/drinks and food/kuku.
+-- Dashboards and the sales audit read this instead of re-deriving sold units
+-- (snacks: previous closing + added - closing) and as-of revenue on every call.
+--
+-- Snacks rows exist for every day with a closing entry (sold may be 0);
+-- food rows only where quantity > 0. Opening/added/closing are NULL for food.
+-- Kept in sync by db.sales_rollup on daily saves, price and subcategory edits.
+
+CREATE TABLE IF NOT EXISTS daily_item_sales (
+  entry_date    DATE NOT NULL,
+  item_id       INT NOT NULL REFERENCES items(id) ON DELETE CASCADE,
+  category      TEXT NOT NULL CHECK (category IN ('snacks', 'drinks', 'food', 'kuku')),
+  opening_stock NUMERIC(12, 2),
+  added_stock   NUMERIC(12, 2),
+  closing_stock NUMERIC(12, 2),
+  sold_units    NUMERIC(12, 2) NOT NULL,
+  price_ksh     NUMERIC(10, 2) NOT NULL,
+  revenue       NUMERIC NOT NULL,
+  PRIMARY KEY (entry_date, item_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_daily_item_sales_item
+  ON daily_item_sales (item_id);
+
+CREATE INDEX IF NOT EXISTS idx_daily_item_sales_category_date
+  ON daily_item_sales (category, entry_date);
+
+-- Full rebuild keeps this migration idempotent on every deploy.
+DELETE FROM daily_item_sales;
+
+INSERT INTO daily_item_sales (
+  entry_date, item_id, category, opening_stock, added_stock, closing_stock,
+  sold_units, price_ksh, revenue
+)
+SELECT s.entry_date, s.item_id, s.category, s.opening_stock, s.added_stock,
+       s.closing_stock, s.sold_units, s.price_ksh, s.sold_units * s.price_ksh
+FROM (
+  SELECT cur.entry_date, cur.item_id, i.subcategory AS category,
+         COALESCE(prev.closing_stock, 0) AS opening_stock,
+         COALESCE(cur.added_stock, 0) AS added_stock,
+         cur.closing_stock,
+         GREATEST(
+           COALESCE(prev.closing_stock, 0)
+             + COALESCE(cur.added_stock, 0)
+             - cur.closing_stock,
+           0
+         ) AS sold_units,
+         COALESCE(pi.price_ksh, 0) AS price_ksh
+  FROM snacks_drinks_daily cur
+  JOIN items i ON i.id = cur.item_id
+  LEFT JOIN snacks_drinks_daily prev
+    ON prev.item_id = cur.item_id
+   AND prev.entry_date = (cur.entry_date - INTERVAL '1 day')::date
+  LEFT JOIN item_price_intervals pi
+    ON pi.item_id = i.id
+   AND pi.valid_from <= cur.entry_date
+   AND cur.entry_date < pi.valid_to
+  WHERE cur.closing_stock IS NOT NULL
+    AND i.group_type = 'snacks_drinks'
+    AND i.subcategory IN ('snacks', 'drinks')
+  UNION ALL
+  SELECT f.entry_date, f.item_id,
+         CASE WHEN LOWER(i.name) LIKE '%kuku%' THEN 'kuku' ELSE 'food' END,
+         NULL, NULL, NULL,
+         f.quantity,
+         COALESCE(pi.price_ksh, 0)
+  FROM food_kuku_daily f
+  JOIN items i ON i.id = f.item_id
+  LEFT JOIN item_price_intervals pi
+    ON pi.item_id = i.id
+   AND pi.valid_from <= f.entry_date
+   AND f.entry_date < pi.valid_to
+  WHERE i.group_type = 'food_kuku'
+    AND COALESCE(f.quantity, 0) > 0
+) s;
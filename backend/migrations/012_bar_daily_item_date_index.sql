@@ -0,0 +1,5 @@
+-- Latest bar row before a date, per item (audit opening seed, daily opening).
+-- UNIQUE(entry_date, item_id) leads with the date, so it cannot serve this.
+
+CREATE INDEX IF NOT EXISTS idx_bar_daily_item_date
+  ON bar_daily (item_id, entry_date DESC);
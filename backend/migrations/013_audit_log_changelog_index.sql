@@ -0,0 +1,5 @@
+-- Keyset pagination of /inventory/changelog: newest first per table, with id
+-- as the tie-breaker for entries written in the same transaction.
+
+CREATE INDEX IF NOT EXISTS idx_audit_table_changed
+  ON inventory_audit_log (table_name, changed_at DESC, id DESC);
@@ -0,0 +1,15 @@
+-- Single-row counter for the item catalog and price history.
+-- HTTP validators (db/data_version.py) read it instead of scanning items and
+-- item_prices. Bumped inside the writing transaction by
+-- db.price_sql.sync_price_intervals and every item write in db/items.py, so
+-- readers only see the new value once the change itself is visible.
+-- Migrations that rewrite items or prices should bump it as well.
+
+CREATE TABLE IF NOT EXISTS catalog_version (
+  id      BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+  version BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO catalog_version (id, version)
+VALUES (TRUE, 0)
+ON CONFLICT (id) DO NOTHING;
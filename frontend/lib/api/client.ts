@@ -62,7 +62,8 @@ async function apiFetchOnce<T>(path: string, options: RequestInit = {}): Promise
   const res = await fetch(`${API_BASE}${path}`, {
     ...options,
     headers,
-    cache: "no-store",
+    // Revalidate with If-None-Match; unchanged GETs come back as 304.
+    cache: "no-cache",
   });
   if (res.status === 401 && typeof window !== "undefined") {
     const body = await res.json().catch(() => ({}));